@@ -5,11 +5,76 @@ Slack Client ラッパー
 プロジェクト全体で統一したインターフェースを提供します。
 """
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from slack_sdk import WebClient
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
 
 logger = logging.getLogger(__name__)
 
+# HTTP 429（ratelimited）時に Retry-After に従って再送する最大回数
+SLACK_RATE_LIMIT_MAX_RETRIES = 3
+
+# Bot参加チャンネル一覧のキャッシュ（bot_token ごと）。レポートのたびに users.conversations を辿らないため
+BOT_CHANNELS_CACHE_TTL_SEC = 600
+_bot_channels_cache: Dict[str, Tuple[float, List[str]]] = {}
+_bot_channels_cache_lock = threading.Lock()
+# users.conversations の1ページあたりの取得件数（API上限は1000未満）。ページ数＝往復回数を減らすため上限近くまで取る
+BOT_CHANNELS_PAGE_LIMIT = 999
+
+# ユーザー表示名のキャッシュ（(bot_token, user_id) ごと）。users.info は呼び出し回数の制限が厳しいため
+# 表示名の変更は TTL 経過後に反映される
+USER_NAME_CACHE_TTL_SEC = 3600
+USER_NAME_CACHE_MAXSIZE = 4096
+_user_name_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+_user_name_cache_lock = threading.Lock()
+
+# users.list で取得したワークスペース全ユーザーの表示名（bot_token ごと）
+# 一定数以上の名前をまとめて解決する場合は、users.info を人数分呼ぶ代わりにこれを使う
+ALL_USER_NAMES_CACHE_TTL_SEC = 600
+USERS_LIST_BULK_THRESHOLD = 10
+_all_user_names_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_all_user_names_cache_lock = threading.Lock()
+
+
+def invalidate_bot_joined_channels(token: str) -> None:
+    """
+    Bot参加チャンネル一覧のキャッシュを破棄します。
+    
+    Args:
+        token: Bot User OAuth Token
+        
+    Note:
+        Bot がチャンネルに参加したときに呼び出し、次回のレポートで新しいチャンネルを含めます。
+    """
+    with _bot_channels_cache_lock:
+        _bot_channels_cache.pop(token, None)
+
+
+def _get_cached_user_name(token: str, user_id: str) -> Optional[str]:
+    """キャッシュ済みの表示名を返します（未登録・期限切れの場合は None）。"""
+    key = (token, user_id)
+    with _user_name_cache_lock:
+        cached = _user_name_cache.get(key)
+        if cached is None:
+            return None
+        if time.monotonic() - cached[0] >= USER_NAME_CACHE_TTL_SEC:
+            del _user_name_cache[key]
+            return None
+        _user_name_cache.move_to_end(key)
+        return cached[1]
+
+
+def _put_cached_user_name(token: str, user_id: str, name: str) -> None:
+    """表示名をキャッシュに保存します（上限を超えた分は古い順に破棄）。"""
+    with _user_name_cache_lock:
+        _user_name_cache[(token, user_id)] = (time.monotonic(), name)
+        _user_name_cache.move_to_end((token, user_id))
+        while len(_user_name_cache) > USER_NAME_CACHE_MAXSIZE:
+            _user_name_cache.popitem(last=False)
+
 
 def get_slack_client(team_id: str) -> WebClient:
     """
@@ -43,7 +108,30 @@ def get_slack_client(team_id: str) -> WebClient:
         raise ValueError(f"bot_token not configured for team_id: {team_id}")
     
     logger.info(f"Slack WebClient を生成しました: team_id={team_id}")
-    return WebClient(token=bot_token)
+    client = WebClient(token=bot_token)
+    install_rate_limit_retry(client)
+    return client
+
+
+def install_rate_limit_retry(client: WebClient) -> WebClient:
+    """
+    WebClient に Slack のレート制限（HTTP 429）用のリトライハンドラーを追加します。
+
+    SDK標準の RateLimitErrorRetryHandler を使用し、Retry-After ヘッダーの秒数だけ待ってから
+    同じリクエストを再送します。既に追加済みの場合は何もしません。
+
+    Args:
+        client: Slack WebClient
+
+    Returns:
+        引数の WebClient（同一インスタンス）
+    """
+    handlers = getattr(client, "retry_handlers", None)
+    if handlers is None:
+        return client
+    if not any(isinstance(h, RateLimitErrorRetryHandler) for h in handlers):
+        handlers.append(RateLimitErrorRetryHandler(max_retry_count=SLACK_RATE_LIMIT_MAX_RETRIES))
+    return client
 
 
 def fetch_message_in_channel(
@@ -129,8 +217,11 @@ class SlackClientWrapper:
         """
         Args:
             client: slack_sdk.web.client.WebClient インスタンス
+            
+        Note:
+            送信系のAPIがレート制限で失われないよう、429 用のリトライハンドラーを追加します。
         """
-        self.client = client
+        self.client = install_rate_limit_retry(client)
     
     def fetch_user_display_name(self, user_id: str) -> Optional[str]:
         """
@@ -145,6 +236,7 @@ class SlackClientWrapper:
             
         Note:
             メンション形式（<@U123|name>）が渡された場合も正しく処理されます。
+            取得できた表示名は bot_token ごとに USER_NAME_CACHE_TTL_SEC 秒キャッシュされます。
         """
         try:
             # 1. メンション形式のクレンジング
@@ -152,7 +244,14 @@ class SlackClientWrapper:
             if user_id and isinstance(user_id, str):
                 clean_user_id = user_id.replace("<@", "").replace(">", "").split("|")[0]
             
-            # 2. Slack API呼び出し
+            # 2. キャッシュ確認（同じユーザーを繰り返し users.info で引かない）
+            token = getattr(self.client, "token", None) or ""
+            if token:
+                cached_name = _get_cached_user_name(token, clean_user_id)
+                if cached_name is not None:
+                    return cached_name
+
+            # 3. Slack API呼び出し
             res = self.client.users_info(user=clean_user_id)
             if not res.get("ok"):
                 err = res.get("error", "")
@@ -165,21 +264,70 @@ class SlackClientWrapper:
             profile = user_data.get("profile", {})
 
             # 優先順位: 1. display_name, 2. real_name, 3. user_id
-            display_name = profile.get("display_name", "").strip()
-            if display_name:
-                return display_name
-            
-            real_name = profile.get("real_name", "").strip()
-            if real_name:
-                return real_name
-            
             # どちらもない場合はuser_idをそのまま返す
-            return clean_user_id
+            name = (
+                profile.get("display_name", "").strip()
+                or profile.get("real_name", "").strip()
+                or clean_user_id
+            )
+            if token:
+                _put_cached_user_name(token, clean_user_id, name)
+            return name
             
         except Exception as e:
             logger.error(f"ユーザー名取得失敗: {user_id}, {e}", exc_info=True)
             return None
     
+    def fetch_all_user_names(self) -> Dict[str, str]:
+        """
+        ワークスペースの全ユーザーの表示名を users.list で一括取得します。
+        
+        Returns:
+            {user_id: display_name} の辞書（優先順位: display_name > real_name > user_id）。
+            取得失敗時は空の辞書
+            
+        Note:
+            結果は bot_token ごとに ALL_USER_NAMES_CACHE_TTL_SEC 秒キャッシュされます。
+            削除済みユーザーも含めます（グループに残っている場合に名前を表示するため）。
+        """
+        token = getattr(self.client, "token", None) or ""
+        if token:
+            with _all_user_names_cache_lock:
+                cached = _all_user_names_cache.get(token)
+            if cached and time.monotonic() - cached[0] < ALL_USER_NAMES_CACHE_TTL_SEC:
+                return cached[1]
+
+        names: Dict[str, str] = {}
+        cursor: Optional[str] = None
+        try:
+            while True:
+                resp = self.client.users_list(limit=200, cursor=cursor)
+                if not resp.get("ok"):
+                    logger.error(f"users.list error: {resp.get('error')}")
+                    return {}
+                for member in resp.get("members", []):
+                    uid = member.get("id")
+                    if not uid:
+                        continue
+                    profile = member.get("profile") or {}
+                    names[uid] = (
+                        (profile.get("display_name") or "").strip()
+                        or (profile.get("real_name") or "").strip()
+                        or uid
+                    )
+                cursor = (resp.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    break
+        except Exception as e:
+            logger.error(f"ユーザー一覧の一括取得失敗: {e}", exc_info=True)
+            return {}
+
+        logger.info(f"users.list でユーザー名を一括取得: {len(names)}件")
+        if token:
+            with _all_user_names_cache_lock:
+                _all_user_names_cache[token] = (time.monotonic(), names)
+        return names
+
     def fetch_user_name_map(self, user_ids: List[str]) -> Dict[str, str]:
         """
         複数のユーザーIDから表示名マップを作成します。
@@ -189,9 +337,31 @@ class SlackClientWrapper:
             
         Returns:
             {user_id: display_name} の辞書
+            
+        Note:
+            キャッシュ済みの表示名はそのまま使い、未キャッシュのユーザーが
+            USERS_LIST_BULK_THRESHOLD 件以上の場合は users.list の一括取得結果から解決します
+            （解決した名前は個別キャッシュにも保存）。そこに含まれないユーザー
+            （他ワークスペースのユーザー等）のみ users.info で取得します。
         """
+        token = getattr(self.client, "token", None) or ""
         user_name_map = {}
+        uncached_ids = []
         for uid in user_ids:
+            cached_name = _get_cached_user_name(token, uid) if token else None
+            if cached_name is not None:
+                user_name_map[uid] = cached_name
+            else:
+                uncached_ids.append(uid)
+
+        all_names = self.fetch_all_user_names() if len(uncached_ids) >= USERS_LIST_BULK_THRESHOLD else {}
+        for uid in uncached_ids:
+            bulk_name = all_names.get(uid)
+            if bulk_name is not None:
+                user_name_map[uid] = bulk_name
+                if token:
+                    _put_cached_user_name(token, uid, bulk_name)
+                continue
             try:
                 name = self.fetch_user_display_name(uid)
                 user_name_map[uid] = name if name is not None else uid
@@ -201,47 +371,80 @@ class SlackClientWrapper:
         
         return user_name_map
     
-    def fetch_bot_joined_channels(self) -> List[str]:
+    def fetch_bot_joined_channels(self, force_refresh: bool = False) -> List[str]:
         """
         Botが参加しているチャンネルIDの一覧を取得します。
         
+        Args:
+            force_refresh: True の場合はキャッシュを使わずに再取得する
+            
         Returns:
             チャンネルIDの配列 
             
         Note:
             users.conversations APIを使用してBotが参加しているチャンネルのみを取得します。
             アーカイブされたチャンネルは除外されます。
+            取得結果は bot_token ごとに BOT_CHANNELS_CACHE_TTL_SEC 秒キャッシュされます。
         """
+        cache_key = getattr(self.client, "token", None) or ""
+        if not force_refresh and cache_key:
+            with _bot_channels_cache_lock:
+                cached = _bot_channels_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < BOT_CHANNELS_CACHE_TTL_SEC:
+                return list(cached[1])
+
+        channels: List[str] = []
         try:
-            # users.conversations は Bot が実際に参加しているチャンネルのみを返す
-            channels = []
-            cursor = None
-            
-            while True:
-                response = self.client.users_conversations(
-                    types="public_channel", # private_channelは除外
-                    exclude_archived=True,
-                    limit=200,
-                    cursor=cursor
-                )
-                
-                if not response.get("ok"):
-                    logger.error(f"チャンネル一覧取得エラー: {response.get('error')}")
-                    break
-                
-                channels.extend([c["id"] for c in response.get("channels", [])])
-                
-                # ページネーション処理
-                cursor = response.get("response_metadata", {}).get("next_cursor")
-                if not cursor:
-                    break
-            
-            logger.info(f"Bot参加チャンネル数: {len(channels)}")
-            return channels
-            
+            for channel_id in self.iter_bot_joined_channels():
+                channels.append(channel_id)
         except Exception as e:
+            # 途中のページで失敗した場合は、取得できた分だけ返す（キャッシュはしない）
             logger.error(f"チャンネル一覧取得失敗: {e}", exc_info=True)
-            return []
+            return channels
+
+        logger.info(f"Bot参加チャンネル数: {len(channels)}")
+        if cache_key:
+            with _bot_channels_cache_lock:
+                _bot_channels_cache[cache_key] = (time.monotonic(), list(channels))
+        return channels
+
+    def iter_bot_joined_channels(self) -> Iterator[str]:
+        """
+        Botが参加しているチャンネルIDを、ページごとに取得しながら順に返します。
+        
+        Yields:
+            チャンネルID
+            
+        Raises:
+            RuntimeError: Slack API が ok=false を返した場合
+            
+        Note:
+            users.conversations のページネーション（next_cursor）を最後まで辿ります。
+            ページ単位で取得するため、一覧全体をまとめて保持しません。
+        """
+        cursor = None
+        while True:
+            # users.conversations は Bot が実際に参加しているチャンネルのみを返す
+            response = self.client.users_conversations(
+                types="public_channel", # private_channelは除外
+                exclude_archived=True,
+                limit=BOT_CHANNELS_PAGE_LIMIT,
+                cursor=cursor
+            )
+            if not response.get("ok"):
+                raise RuntimeError(f"チャンネル一覧取得エラー: {response.get('error')}")
+
+            for c in response.get("channels", []):
+                yield c["id"]
+
+            # ページネーション処理
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+
+    def refresh_bot_joined_channels(self) -> List[str]:
+        """キャッシュを無視して Bot 参加チャンネル一覧を再取得します。"""
+        return self.fetch_bot_joined_channels(force_refresh=True)
     
     def send_message(
         self, 
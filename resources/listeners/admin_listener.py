@@ -18,14 +18,34 @@ import datetime
 from typing import List, Dict, Any
 import os
 from resources.listeners.Listener import Listener
-from resources.services.group_service import GroupService
+from resources.services.group_service import GroupService, invalidate_groups_cache
 from resources.services.workspace_service import WorkspaceService
 from resources.templates.modals import create_admin_settings_modal
 from resources.clients.slack_client import get_slack_client
-from resources.constants import get_collection_name, APP_ENV
+from resources.constants import get_collection_name, APP_ENV, STATUS_TRANSLATION
 
 logger = logging.getLogger(__name__)
 
+# デバッグレポートの表示用定数（レポートごとに作り直さないようモジュールで1度だけ定義）
+_WEEKDAYS = ("月", "火", "水", "木", "金", "土", "日")
+
+# 区分の定義順（該当者がいない場合も「なし」で表示）。表示名は STATUS_TRANSLATION から1度だけ取得する
+_DEBUG_REPORT_STATUS_ORDER = tuple(
+    (status_key, STATUS_TRANSLATION.get(status_key, status_key))
+    for status_key in (
+        "vacation", "vacation_am", "vacation_pm", "vacation_hourly",
+        "late_delay", "late",
+        "remote", "out", "shift",
+        "early_leave", "other",
+    )
+)
+
+# 区分ごとの区切り位置（この区分の後にdividerを入れる）
+_DEBUG_REPORT_DIVIDER_AFTER = frozenset({"vacation_hourly", "late", "remote", "out", "shift", "early_leave", "other"})
+
+# divider ブロック（送信時にシリアライズされるだけで変更されないため使い回す）
+_DIVIDER_BLOCK = {"type": "divider"}
+
 
 class AdminListener(Listener):
     """管理機能リスナークラス"""
@@ -161,18 +181,18 @@ class AdminListener(Listener):
                         report_channel_id = selected_option["value"]
                 
                 # Firestoreの workspaces コレクションに保存
-                from resources.shared.db import get_workspace_config
-                from google.cloud import firestore
+                from resources.shared.db import get_firestore_client, invalidate_workspace_config
                 
                 # 空文字列チェック
                 db_name = APP_ENV.strip() if APP_ENV and APP_ENV.strip() else "develop"
-                db = firestore.Client(database=db_name)
+                db = get_firestore_client(db_name)
                 workspace_ref = db.collection(get_collection_name("workspaces")).document(workspace_id)
                 
                 # 既存の設定を取得して更新
                 workspace_ref.set({
                     "report_channel_id": report_channel_id or ""
                 }, merge=True)
+                invalidate_workspace_config(workspace_id)
                 
                 logger.info(f"レポート送信先チャンネル保存: Workspace={workspace_id}, Channel={report_channel_id}")
                 ack()
@@ -395,13 +415,14 @@ class AdminListener(Listener):
                     return
                 
                 # グループを削除
-                from google.cloud import firestore
+                from resources.shared.db import get_firestore_client
                 # 空文字列チェック
                 db_name = APP_ENV.strip() if APP_ENV and APP_ENV.strip() else "develop"
-                db = firestore.Client(database=db_name)
+                db = get_firestore_client(db_name)
                 group_ref = db.collection(get_collection_name("groups")).document(workspace_id)\
                               .collection(get_collection_name("groups")).document(group_id)
                 group_ref.delete()
+                invalidate_groups_cache(workspace_id)
                 logger.info(f"グループ削除: {group_name} ({group_id})")
                 
                 ack()
@@ -557,9 +578,8 @@ class AdminListener(Listener):
                 dt = datetime.date.today()
                 logger.warning(f"日付のパースに失敗したため今日の日付を使用: {dt}")
             
-            weekday_list = ["月", "火", "水", "木", "金", "土", "日"]
             month_day = dt.strftime('%m/%d')
-            weekday = weekday_list[dt.weekday()]
+            weekday = _WEEKDAYS[dt.weekday()]
             
             # 全メンバーのIDを抽出（名前解決用）
             all_member_ids = set()
@@ -618,15 +638,14 @@ class AdminListener(Listener):
                 group_name = group.get("name", "無名グループ")
                 member_ids = group.get("member_ids", [])
                 
-                # レポートブロックの構築
-                blocks = []
-                
-                # タイトル（グループ名を含む）
-                blocks.append({
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": f"*{month_day}({weekday})の勤怠（{group_name}）*"}
-                })
-                blocks.append({"type": "divider"})
+                # レポートブロックの構築（タイトル（グループ名を含む）と divider）
+                blocks = [
+                    {
+                        "type": "section",
+                        "text": {"type": "mrkdwn", "text": f"*{month_day}({weekday})の勤怠（{group_name}）*"}
+                    },
+                    _DIVIDER_BLOCK,
+                ]
                 
                 # ステータスごとにグルーピング
                 status_map = {}
@@ -646,41 +665,19 @@ class AdminListener(Listener):
                         else:
                             status_map[st].append(display_name)
                 
-                # 区分の定義順（該当者がいない場合も「なし」で表示）
-                status_order = [
-                    ("vacation", "全休"),
-                    ("vacation_am", "AM休"),
-                    ("vacation_pm", "PM休"),
-                    ("vacation_hourly", "時間休"),
-                    ("late_delay", "電車遅延"),
-                    ("late", "遅刻"),
-                    ("remote", "在宅"),
-                    ("out", "外出"),
-                    ("shift", "シフト勤務"),
-                    ("early_leave", "早退"),
-                    ("other", "その他")
-                ]
-                
-                # 区分ごとの区切り位置（この区分の後にdividerを入れる）
-                divider_after = {"vacation_hourly", "late", "remote", "out", "shift", "early_leave", "other"}
-                
-                for status_key, status_label in status_order:
-                    if status_key in status_map:
-                        users_text = " \n\t".join(status_map[status_key])
-                        blocks.append({
-                            "type": "section",
-                            "text": {"type": "mrkdwn", "text": f"*{status_label}：* \n\t{users_text}"}
-                        })
-                    else:
-                        # 該当者なしの場合も表示
-                        blocks.append({
-                            "type": "section",
-                            "text": {"type": "mrkdwn", "text": f"*{status_label}：* \n\tなし"}
-                        })
+                append_block = blocks.append
+                for status_key, status_label in _DEBUG_REPORT_STATUS_ORDER:
+                    # 該当者なしの場合も「なし」で表示
+                    users = status_map.get(status_key)
+                    users_text = "\n\t".join(users) if users else "なし"
+                    append_block({
+                        "type": "section",
+                        "text": {"type": "mrkdwn", "text": f"*{status_label}：*\n\t{users_text}"}
+                    })
                     
                     # 指定された区分の後にdividerを追加
-                    if status_key in divider_after:
-                        blocks.append({"type": "divider"})
+                    if status_key in _DEBUG_REPORT_DIVIDER_AFTER:
+                        append_block(_DIVIDER_BLOCK)
                 
                 # レポートを送信
                 try:
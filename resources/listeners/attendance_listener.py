@@ -490,77 +490,83 @@ class AttendanceListener(Listener):
             # NotificationService を動的に生成
             notification_service = NotificationService(client, self.attendance_service)
 
-            # 4. ループ処理
-            for att in attendances:
-                date = att.get("date")
-                action = att.get("action", "save")
-
-                # A. 削除アクション
-                if action == "delete":
-                    if thread_context:
-                        # スレッド返信: 明示的キーワードまたは遅刻取消フレーズがなければガード
-                        pattern_a = reply_has_explicit_cancellation_keywords(text)
-                        pattern_b = reply_has_late_cancellation_phrases(text)
-                        if not pattern_a and not pattern_b:
-                            logger.info(
-                                f"スレッド返信の削除をスキップ（ガード）: text={text[:30]}..."
+            # 4. ループ処理（保存した記録の通知カードは最後に1通へまとめて送信）
+            saved_records = []
+            try:
+                for att in attendances:
+                    date = att.get("date")
+                    action = att.get("action", "save")
+
+                    # A. 削除アクション
+                    if action == "delete":
+                        if thread_context:
+                            # スレッド返信: 明示的キーワードまたは遅刻取消フレーズがなければガード
+                            pattern_a = reply_has_explicit_cancellation_keywords(text)
+                            pattern_b = reply_has_late_cancellation_phrases(text)
+                            if not pattern_a and not pattern_b:
+                                logger.info(
+                                    f"スレッド返信の削除をスキップ（ガード）: text={text[:30]}..."
+                                )
+                                try:
+                                    client.chat_postEphemeral(
+                                        channel=channel,
+                                        user=user_id,
+                                        text="取消する場合は、メッセージに「取消」「キャンセル」「取り消し」「削除」「間に合った」「出社した」のいずれかを含めて送信してください。"
+                                    )
+                                except Exception:
+                                    pass
+                                continue
+                        else:
+                            # スタンドアロン: 明示的キーワードがなければ 9 時前のみ取消
+                            if not reply_has_explicit_cancellation_keywords(text) and not is_before_9am(ts):
+                                logger.info(
+                                    f"出社/間に合い報告だが9時以降のため取消スキップ: ts={ts}, text={text[:30]}..."
+                                )
+                                continue
+                        try:
+                            self.attendance_service.delete_attendance(team_id, effective_user_id, date)
+                            notification_service.notify_attendance_change(
+                                record={"user_id": effective_user_id, "date": date, "email": effective_email},
+                                channel=channel,
+                                thread_ts=ts,
+                                is_delete=True
                             )
+                        except Exception as e:
+                            logger.info(f"Delete failed/skipped: {date}, Error: {e}")
+                            # 削除対象が見つからない場合もユーザーに通知
                             try:
-                                client.chat_postEphemeral(
+                                client.chat_postMessage(
                                     channel=channel,
-                                    user=user_id,
-                                    text="取消する場合は、メッセージに「取消」「キャンセル」「取り消し」「削除」「間に合った」「出社した」のいずれかを含めて送信してください。"
+                                    thread_ts=ts,
+                                    text=f"⚠️ {date} の勤怠記録が見つかりませんでした。すでに取り消されているか、記録されていない可能性があります。"
                                 )
                             except Exception:
                                 pass
-                            continue
-                    else:
-                        # スタンドアロン: 明示的キーワードがなければ 9 時前のみ取消
-                        if not reply_has_explicit_cancellation_keywords(text) and not is_before_9am(ts):
-                            logger.info(
-                                f"出社/間に合い報告だが9時以降のため取消スキップ: ts={ts}, text={text[:30]}..."
-                            )
-                            continue
-                    try:
-                        self.attendance_service.delete_attendance(team_id, effective_user_id, date)
-                        notification_service.notify_attendance_change(
-                            record={"user_id": effective_user_id, "date": date, "email": effective_email},
-                            channel=channel,
-                            thread_ts=ts,
-                            is_delete=True
-                        )
-                    except Exception as e:
-                        logger.info(f"Delete failed/skipped: {date}, Error: {e}")
-                        # 削除対象が見つからない場合もユーザーに通知
-                        try:
-                            client.chat_postMessage(
-                                channel=channel,
-                                thread_ts=ts,
-                                text=f"⚠️ {date} の勤怠記録が見つかりませんでした。すでに取り消されているか、記録されていない可能性があります。"
-                            )
-                        except Exception:
-                            pass
-                    continue
+                        continue
 
-                # B. 保存・更新アクション
-                record = self.attendance_service.save_attendance(
-                    workspace_id=team_id,
-                    user_id=effective_user_id,
-                    email=effective_email,
-                    date=date,
-                    status=att.get("status"),
-                    note=att.get("note", ""),
-                    channel_id=channel,
-                    ts=ts
-                )
+                    # B. 保存・更新アクション
+                    record = self.attendance_service.save_attendance(
+                        workspace_id=team_id,
+                        user_id=effective_user_id,
+                        email=effective_email,
+                        date=date,
+                        status=att.get("status"),
+                        note=att.get("note", ""),
+                        channel_id=channel,
+                        ts=ts
+                    )
                 
-                # 通知カードの送信
-                notification_service.notify_attendance_change(
-                    record=record,
-                    channel=channel,
-                    thread_ts=ts,
-                    is_update=False
-                )
+                    # 通知カードは送信待ちに追加
+                    saved_records.append(record)
+            finally:
+                # 途中で保存に失敗した場合も、保存済みの分は通知する
+                if saved_records:
+                    notification_service.notify_attendance_changes(
+                        records=saved_records,
+                        channel=channel,
+                        thread_ts=ts,
+                        is_update=False
+                    )
                 
         except Exception as e:
             logger.error(f"解析・保存エラー: {e}", exc_info=True)
@@ -14,13 +14,14 @@ import datetime
 from typing import Optional
 
 from resources.listeners.Listener import Listener
-from resources.clients.slack_client import get_slack_client
+from resources.clients.slack_client import get_slack_client, invalidate_bot_joined_channels
 from resources.shared.db import (
     is_channel_history_processed,
     mark_channel_history_processed,
     append_or_update_workspace_user,
 )
 from resources.shared.utils import get_user_email
+from resources.services.nlp_service import extract_attendance_from_texts, BATCH_EXTRACTION_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -120,6 +121,10 @@ class SystemListener(Listener):
                     f"[Bot参加イベント] Bot自身の参加を検知: "
                     f"Team={team_id}, Channel={channel_id}, Bot User={bot_user_id}"
                 )
+
+                # 参加チャンネル一覧のキャッシュを破棄（次回のレポート送信先に反映させる）
+                if dynamic_client.token:
+                    invalidate_bot_joined_channels(dynamic_client.token)
                 
                 # Pub/Subに投げる（非同期処理へ）
                 self.publish_to_worker(
@@ -244,10 +249,11 @@ class SystemListener(Listener):
             
             logger.info(f"[過去ログ解析開始] 対象: {len(all_messages)}件のメッセージ（古い順）")
             
+            # 解析対象のメッセージを抽出（スキップ条件に該当するものを除外）
+            targets = []
             for idx, msg in enumerate(all_messages, 1):
                 user_id = msg.get("user")
                 text = (msg.get("text") or "").strip()
-                ts = msg.get("ts")
                 bot_id = msg.get("bot_id")
                 subtype = msg.get("subtype")
                 
@@ -267,40 +273,59 @@ class SystemListener(Listener):
                     skipped_count += 1
                     continue
                 
-                # 処理対象のメッセージをログ出力
-                text_preview = text[:50] + "..." if len(text) > 50 else text
-                logger.info(
-                    f"[{idx}/{len(all_messages)}] 処理中: User={user_id}, "
-                    f"Text='{text_preview}', TS={ts}"
+                targets.append((idx, msg, user_id, text))
+            
+            # 複数メッセージをまとめてAI解析し（API呼び出し回数を削減）、古い順に保存
+            for start in range(0, len(targets), BATCH_EXTRACTION_SIZE):
+                batch = targets[start:start + BATCH_EXTRACTION_SIZE]
+                extractions = extract_attendance_from_texts(
+                    [{"text": text, "message_ts": msg.get("ts"), "user_id": user_id} for _, msg, user_id, text in batch],
+                    team_id=team_id
                 )
                 
-                try:
-                    # ユーザー情報を取得
-                    email: Optional[str] = get_user_email(client, user_id, logger)
+                for (idx, msg, user_id, text), extraction in zip(batch, extractions):
+                    ts = msg.get("ts")
                     
-                    # 勤怠情報を解析・保存（通知なし）
-                    result = self.attendance_service.process_historical_message(
-                        workspace_id=team_id,
-                        user_id=user_id,
-                        email=email,
-                        text=text,
-                        channel_id=channel_id,
-                        ts=ts
+                    # 処理対象のメッセージをログ出力
+                    text_preview = text[:50] + "..." if len(text) > 50 else text
+                    logger.info(
+                        f"[{idx}/{len(all_messages)}] 処理中: User={user_id}, "
+                        f"Text='{text_preview}', TS={ts}"
                     )
                     
-                    if result:
-                        processed_count += 1
-                        logger.info(f"[{idx}/{len(all_messages)}] ✓ 保存成功: User={user_id}")
-                    else:
+                    if not extraction:
                         logger.info(f"[{idx}/{len(all_messages)}] - AI解析失敗（勤怠情報なし）: User={user_id}")
                         skipped_count += 1
+                        continue
+                    
+                    try:
+                        # ユーザー情報を取得
+                        email: Optional[str] = get_user_email(client, user_id, logger)
                         
-                except Exception as e:
-                    error_count += 1
-                    logger.error(
-                        f"[{idx}/{len(all_messages)}] ✗ 処理エラー: User={user_id}, "
-                        f"Error={str(e)}", exc_info=True
-                    )
+                        # 勤怠情報を保存（通知なし）
+                        result = self.attendance_service.process_historical_message(
+                            workspace_id=team_id,
+                            user_id=user_id,
+                            email=email,
+                            text=text,
+                            channel_id=channel_id,
+                            ts=ts,
+                            extraction=extraction
+                        )
+                        
+                        if result:
+                            processed_count += 1
+                            logger.info(f"[{idx}/{len(all_messages)}] ✓ 保存成功: User={user_id}")
+                        else:
+                            logger.info(f"[{idx}/{len(all_messages)}] - 保存対象なし: User={user_id}")
+                            skipped_count += 1
+                            
+                    except Exception as e:
+                        error_count += 1
+                        logger.error(
+                            f"[{idx}/{len(all_messages)}] ✗ 処理エラー: User={user_id}, "
+                            f"Error={str(e)}", exc_info=True
+                        )
             
             # 処理済みフラグを立てる
             mark_channel_history_processed(team_id, channel_id)
@@ -18,6 +18,7 @@ import logging
 from typing import Optional, Dict, Any
 import base64
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # --- 強制ログフラッシュ設定 ---
 # Pythonの出力をバッファリングせず、即座にCloud Runのログへ送る
@@ -75,6 +76,7 @@ from resources.services.notification_service import NotificationService
 from resources.listeners import register_all_listeners
 from resources.clients.slack_client import fetch_workspace_user_list
 from resources.shared.auth import verify_oidc_token
+from resources.shared.db import get_firestore_client, invalidate_workspace_config
 from resources.shared.errors import AuthorizationError, DomainNotAllowedError
 
 logger.info(f"Initializing Slack Attendance Bot (Multi-tenant mode)")
@@ -184,6 +186,7 @@ class FirestoreInstallationStore(InstallationStore):
             logger.info(f"[OAuth Save] bot_token prefix: {installation.bot_token[:20] if installation.bot_token else 'None'}...")
             
             self.db.collection(collection_name).document(team_id).set(data, merge=True)
+            invalidate_workspace_config(team_id)
             logger.info(f"Installation saved to Firestore: team_id={team_id}, team_name={installation.team_name}")
 
             # インストール直後にワークスペースユーザリストを初回作成
@@ -273,10 +276,10 @@ logger.info(f"[INIT] APP_ENV value: '{APP_ENV}'")
 # 空文字列チェック（Firestoreは空文字列を"(default)"として扱う）
 if not APP_ENV or not APP_ENV.strip():
     logger.error(f"APP_ENV is empty! Using 'develop' as fallback. APP_ENV='{APP_ENV}'")
-    db_client = firestore.Client(database="develop")
+    db_client = get_firestore_client("develop")
     logger.info(f"[INIT] Main Firestore client initialized with database: develop (fallback)")
 else:
-    db_client = firestore.Client(database=APP_ENV)
+    db_client = get_firestore_client(APP_ENV)
     logger.info(f"[INIT] Main Firestore client initialized with database: {APP_ENV}")
 
 # ==========================================
@@ -386,6 +389,9 @@ else:
 # サービスの準備
 attendance_service = AttendanceService()
 
+# 日次レポートでワークスペースを並行処理する際の最大スレッド数（空文字は既定値、0以下は1に切り上げる）
+REPORT_MAX_WORKERS = max(1, int(os.getenv("REPORT_MAX_WORKERS") or "8"))
+
 # リスナーの登録（Pub/Sub対応版）
 listener_map = register_all_listeners(app, attendance_service)
 logger.info("All listeners registered")
@@ -513,22 +519,29 @@ def slack_bot(request):
             JST = timezone(timedelta(hours=9))
             today_str = datetime.datetime.now(JST).date().isoformat()
             
-            workspaces_docs = db_client.collection(get_collection_name("workspaces")).stream()
-            
-            success_count = 0
-            error_count = 0
-            
-            for ws_doc in workspaces_docs:
-                workspace_id = ws_doc.id
+            workspace_ids = [
+                ws_doc.id for ws_doc in db_client.collection(get_collection_name("workspaces")).stream()
+            ]
+
+            def send_workspace_report(workspace_id: str) -> bool:
                 try:
                     client = get_slack_client(workspace_id)
                     notification_service_instance = NotificationService(client, attendance_service)
                     notification_service_instance.send_daily_report(today_str, workspace_id)
-                    success_count += 1
+                    return True
                 except Exception as ws_error:
                     logger.error(f"Failed to send report for workspace {workspace_id}: {ws_error}", exc_info=True)
-                    error_count += 1
-            
+                    return False
+
+            # ワークスペースごとのレポートは独立しているため並行して送信する
+            results = []
+            if workspace_ids:
+                with ThreadPoolExecutor(max_workers=min(len(workspace_ids), REPORT_MAX_WORKERS)) as executor:
+                    results = list(executor.map(send_workspace_report, workspace_ids))
+
+            success_count = sum(1 for ok in results if ok)
+            error_count = len(results) - success_count
+
             return {
                 "status": "completed",
                 "date": today_str,
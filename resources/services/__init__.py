@@ -1,7 +1,7 @@
 # Services package - Business logic and external integrations
 
 from .attendance_service import AttendanceService
-from .nlp_service import extract_attendance_from_text
+from .nlp_service import extract_attendance_from_text, extract_attendance_from_texts
 from .notification_service import NotificationService
 from .group_service import GroupService
 from .workspace_service import WorkspaceService
@@ -9,6 +9,7 @@ from .workspace_service import WorkspaceService
 __all__ = [
     "AttendanceService",
     "extract_attendance_from_text",
+    "extract_attendance_from_texts",
     "NotificationService",
     "GroupService",
     "WorkspaceService"
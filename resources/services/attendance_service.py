@@ -15,9 +15,8 @@ from resources.shared.db import (
     get_user_history_from_db,
     get_today_records,
     delete_attendance_record_db,
-    get_channel_members_with_section
 )
-from resources.shared.errors import ValidationError, AuthorizationError
+from resources.shared.errors import ValidationError
 
 logger = logging.getLogger(__name__)
 
@@ -397,7 +396,8 @@ class AttendanceService:
         email: str,
         text: str,
         channel_id: str,
-        ts: str
+        ts: str,
+        extraction: Optional[Dict[str, Any]] = None
     ) -> bool:
         """
         過去メッセージから勤怠情報を解析・保存します（通知なし）。
@@ -409,6 +409,8 @@ class AttendanceService:
             text: メッセージテキスト
             channel_id: チャンネルID
             ts: メッセージのタイムスタンプ
+            extraction: 一括抽出（extract_attendance_from_texts）で取得済みの抽出結果。
+                指定時はAI解析を行わずにこの結果を使用します。
             
         Returns:
             勤怠情報が抽出・保存された場合True、それ以外False
@@ -418,17 +420,18 @@ class AttendanceService:
             通知は一切行いません。
         """
         try:
-            from resources.services.nlp_service import extract_attendance_from_text
-            
-            logger.info(f"[過去ログ] AI解析開始: User={user_id}, Text='{text[:30]}...', TS={ts}")
-            
-            # AI解析実行（過去ログの場合はメッセージのタイムスタンプを渡す）
-            extraction = extract_attendance_from_text(
-                text, 
-                team_id=workspace_id, 
-                user_id=user_id,
-                message_ts=ts
-            )
+            if extraction is None:
+                from resources.services.nlp_service import extract_attendance_from_text
+                
+                logger.info(f"[過去ログ] AI解析開始: User={user_id}, Text='{text[:30]}...', TS={ts}")
+                
+                # AI解析実行（過去ログの場合はメッセージのタイムスタンプを渡す）
+                extraction = extract_attendance_from_text(
+                    text, 
+                    team_id=workspace_id, 
+                    user_id=user_id,
+                    message_ts=ts
+                )
             
             if not extraction:
                 logger.info(f"[過去ログ] AI解析結果: 勤怠情報なし (User={user_id})")
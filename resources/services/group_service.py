@@ -5,16 +5,40 @@
 v2.0で追加された機能です。
 """
 
-import uuid
+import copy
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
 from google.cloud import firestore
 
 from resources.shared.errors import ValidationError
 from resources.constants import get_collection_name, APP_ENV
+from resources.shared.db import get_firestore_client
 
 logger = logging.getLogger(__name__)
 
+# グループ一覧のキャッシュ（workspace_id ごと）。日次レポートなど読み取り専用の処理で使用する
+# このプロセスでの更新時は invalidate_groups_cache で即時破棄し、他インスタンスの更新は TTL 経過後に反映される
+GROUPS_CACHE_TTL_SEC = 300
+_groups_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_groups_cache_lock = threading.Lock()
+
+
+def invalidate_groups_cache(workspace_id: str) -> None:
+    """
+    グループ一覧のキャッシュを破棄します。
+    
+    Args:
+        workspace_id: Slackワークスペースの一意ID
+        
+    Note:
+        groups コレクションを更新した箇所から呼び出してください。
+    """
+    with _groups_cache_lock:
+        _groups_cache.pop(workspace_id, None)
+
 
 class GroupService:
     """
@@ -28,15 +52,17 @@ class GroupService:
         """グループサービスの初期化"""
         # 空文字列チェック
         db_name = APP_ENV.strip() if APP_ENV and APP_ENV.strip() else "develop"
-        self.db = firestore.Client(database=db_name)
+        self.db = get_firestore_client(db_name)
         logger.info(f"GroupService initialized with database: {db_name}")
 
-    def get_all_groups(self, workspace_id: str) -> List[Dict[str, Any]]:
+    def get_all_groups(self, workspace_id: str, use_cache: bool = False) -> List[Dict[str, Any]]:
         """
         ワークスペース内の全グループを取得します。
         
         Args:
             workspace_id: Slackワークスペースの一意ID
+            use_cache: True の場合、GROUPS_CACHE_TTL_SEC 秒以内の取得結果を再利用する
+                （管理画面など直後の更新を反映させたい処理では False のまま使用）
             
         Returns:
             グループ情報の配列:
@@ -46,12 +72,20 @@ class GroupService:
                     "name": "営業1課",
                     "member_ids": ["U001", "U002"],
                     "admin_ids": ["U100", "U101"],
+                    "report_channel_id": "C01234567",  # 任意。日次レポートの送信先（ワークスペース設定より優先）
                     "created_at": "2026-01-21T10:00:00",
                     "updated_at": "2026-01-21T10:00:00"
                 },
                 ...
             ]
         """
+        if use_cache:
+            with _groups_cache_lock:
+                cached = _groups_cache.get(workspace_id)
+            if cached and time.monotonic() - cached[0] < GROUPS_CACHE_TTL_SEC:
+                # 呼び出し側で変更されてもキャッシュが壊れないようコピーを返す
+                return copy.deepcopy(cached[1])
+
         try:
             groups_ref = self.db.collection(get_collection_name("groups")).document(workspace_id).collection(get_collection_name("groups"))
             docs = groups_ref.stream()
@@ -79,6 +113,8 @@ class GroupService:
                 groups.append(data)
             
             logger.info(f"グループ取得成功: Workspace={workspace_id}, Count={len(groups)}")
+            with _groups_cache_lock:
+                _groups_cache[workspace_id] = (time.monotonic(), copy.deepcopy(groups))
             return groups
         except Exception as e:
             logger.error(f"グループ取得失敗: {e}", exc_info=True)
@@ -164,6 +200,7 @@ class GroupService:
                 data["created_by"] = created_by
             
             group_ref.set(data)
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ作成成功: {group_id}, Name={name}, Members={len(member_ids or [])}, Admins={len(admin_ids or [])}")
             return group_id
         except Exception as e:
@@ -197,6 +234,7 @@ class GroupService:
                 "member_ids": member_ids,
                 "updated_at": firestore.SERVER_TIMESTAMP
             })
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループメンバー更新成功: {group_id}, Members={len(member_ids)}")
         except ValidationError:
             raise
@@ -231,6 +269,7 @@ class GroupService:
                 "admin_ids": admin_ids,
                 "updated_at": firestore.SERVER_TIMESTAMP
             })
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ管理者更新成功: {group_id}, Admins={len(admin_ids)}")
         except ValidationError:
             raise
@@ -272,6 +311,7 @@ class GroupService:
                 "admin_ids": admin_ids,
                 "updated_at": firestore.SERVER_TIMESTAMP
             })
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ更新成功: {group_id}, Name={name}, Members={len(member_ids)}, Admins={len(admin_ids)}, admin_ids={admin_ids}")
         except ValidationError:
             raise
@@ -309,6 +349,7 @@ class GroupService:
                 "name": name.strip(),
                 "updated_at": firestore.SERVER_TIMESTAMP
             })
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ名更新成功: {group_id}, Name={name}")
         except ValidationError:
             raise
@@ -372,6 +413,7 @@ class GroupService:
                 return
             
             group_ref.delete()
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ削除成功: {group_id}")
         except Exception as e:
             logger.error(f"グループ削除失敗: {e}", exc_info=True)
@@ -444,6 +486,7 @@ class GroupService:
                 data["created_by"] = created_by
             
             group_ref.set(data)
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ作成成功(v2.2): {sanitized_name}, Members={len(member_ids or [])}, Admins={len(admin_ids or [])}")
             return sanitized_name
         except ValidationError:
@@ -491,6 +534,7 @@ class GroupService:
                 update_data["admin_ids"] = admin_ids
             
             group_ref.update(update_data)
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ更新成功(v2.2): {group_id}, Members={len(member_ids)}, Admins={len(admin_ids) if admin_ids is not None else 'unchanged'}")
         except ValidationError:
             raise
@@ -519,6 +563,7 @@ class GroupService:
                 return
             
             group_ref.delete()
+            invalidate_groups_cache(workspace_id)
             logger.info(f"グループ削除成功(v2.2): {group_id}")
         except Exception as e:
             logger.error(f"グループ削除失敗(v2.2): {e}", exc_info=True)
@@ -5,11 +5,17 @@
 勤怠情報を抽出します。打ち消し線や複数日の記録にも対応しています。
 """
 import datetime
+import functools
+import hashlib
 import json
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
-from resources.shared.setup_logger import setup_logger, log_openai_cost
+from resources.shared.setup_logger import setup_logger, log_openai_cost, log_structured
 from resources.constants import STATUS_AI_ALIASES  # constantsから読み込む
 
 try:
@@ -17,8 +23,188 @@ try:
 except ImportError:
     OpenAI = None
 
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = setup_logger(__name__)
 
+# JSONのパース・シリアライズ（orjson があれば高速な実装を使う。JSONDecodeError は ValueError 互換）
+if orjson:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+# OpenAI のアカウント上限（TPM: tokens per minute）。gpt-4o-mini の既定値は 200k
+# 空文字で設定されている場合も既定値を使い、0以下はトークンバケットが割り算できないため1に切り上げる
+OPENAI_TPM_LIMIT = max(1, int(os.getenv("OPENAI_TPM_LIMIT") or "200000"))
+# 応答（completion）側として見込むトークン数
+COMPLETION_TOKENS_ESTIMATE = 300
+
+
+class _TokenBucket:
+    """
+    TPM上限に合わせたトークンバケット（スレッドセーフ）。
+
+    バースト時に 429 を受けてSDK側で指数バックオフされるのを避けるため、
+    呼び出し前に見積もりトークン数を確保し、不足分は待機してから送信します。
+    """
+
+    def __init__(self, tpm: int):
+        self.capacity = float(tpm)
+        self.rate = tpm / 60.0  # 1秒あたりの補充量
+        self.tokens = float(tpm)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: int) -> float:
+        """
+        トークンを確保します。不足している場合は補充されるまで待機します。
+
+        Args:
+            amount: 確保するトークン数（上限はバケット容量）
+
+        Returns:
+            待機した秒数
+        """
+        amount = min(float(amount), self.capacity)
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # 先に予約して（マイナス残高を許容）、待ち時間は順番通りに積み上がるようにする
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_rate_limiter = _TokenBucket(OPENAI_TPM_LIMIT)
+
+
+# 「今日」の日付・曜日・ISO文字列のキャッシュ（日付が変わった時だけ作り直す）
+_today_cache = (None, "", "")  # (date, weekday, iso)
+
+
+def _today_label():
+    """
+    今日の日付とその曜日名・ISO形式文字列を返します。
+
+    strftime('%A') や isoformat() の文字列は日付が変わるまで同じため、
+    日付をキーにキャッシュします（日付の変わり目でも古い値を返しません）。
+
+    Returns:
+        (date, weekday_str, iso_str) のタプル
+    """
+    global _today_cache
+    d = datetime.date.today()
+    if _today_cache[0] != d:
+        _today_cache = (d, d.strftime('%A'), d.isoformat())
+    return _today_cache
+
+
+# 抽出結果キャッシュ（プロセス内LRU + Redis）。Redis は REDIS_URL 未設定時は無効
+# プロンプト（system_instruction / few-shot）を変更したら _PROMPT_VERSION を更新してキャッシュを無効化する
+_PROMPT_VERSION = "2026-01-28"
+_CACHE_TTL_SEC = 86400
+_LOCAL_CACHE_MAXSIZE = 512
+# Redis 障害時に抽出処理全体が止まらないよう、接続・応答待ちは短く打ち切る（キャッシュミス扱い）
+_REDIS_TIMEOUT_SEC = 0.5
+REDIS_URL = os.getenv("REDIS_URL")
+_redis_client = (
+    redis.Redis.from_url(
+        REDIS_URL,
+        socket_connect_timeout=_REDIS_TIMEOUT_SEC,
+        socket_timeout=_REDIS_TIMEOUT_SEC,
+    )
+    if redis and REDIS_URL else None
+)
+_local_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_local_cache_lock = threading.Lock()
+
+# OpenAI側のプレフィックスキャッシュ（system + few-shot が共通）をヒットさせるためのキー
+_PROMPT_CACHE_KEY = f"attendance-extractor:{_PROMPT_VERSION}"
+
+
+def _cache_key(model_name: str, base_iso: str, user_content: str) -> str:
+    """
+    抽出結果キャッシュのキーを生成します。
+
+    user_content には基準日・本文・スレッド文脈・ユーザー一覧が全て含まれるため、
+    モデル名・プロンプト版と合わせたハッシュで入力を一意に識別します。
+    各フィールドは長さを前置して連結し、区切り位置の違いによる衝突を防ぎます。
+    """
+    h = hashlib.sha256()
+    for field in (model_name, _PROMPT_VERSION, base_iso, user_content):
+        encoded = field.encode("utf-8")
+        h.update(f"{len(encoded)}:".encode("ascii"))
+        h.update(encoded)
+    return f"nlp:v2:{h.hexdigest()}"
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """キャッシュからAIの応答（JSON）を取得します。ミス・エラー時は None。"""
+    with _local_cache_lock:
+        data = _local_cache.get(key)
+        if data is not None:
+            _local_cache.move_to_end(key)
+            return data
+    if not _redis_client:
+        return None
+    try:
+        value = _redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"抽出キャッシュ取得失敗: {e}")
+        return None
+    if not value:
+        return None
+    try:
+        data = _json_loads(value)
+    except (ValueError, TypeError) as e:  # 破損・別形式の値はキャッシュミスとして扱う
+        logger.warning(f"抽出キャッシュの値を解釈できません（キャッシュミス扱い）: {e}")
+        return None
+    if not isinstance(data, dict):
+        logger.warning("抽出キャッシュの値がJSONオブジェクトではありません（キャッシュミス扱い）")
+        return None
+    _local_cache_put(key, data)
+    return data
+
+
+def _local_cache_put(key: str, data: Dict[str, Any]) -> None:
+    """プロセス内LRUキャッシュに保存します（上限を超えた分は古い順に破棄）。"""
+    with _local_cache_lock:
+        _local_cache[key] = data
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > _LOCAL_CACHE_MAXSIZE:
+            _local_cache.popitem(last=False)
+
+
+def _cache_set(key: str, data: Dict[str, Any]) -> None:
+    """AIの応答（JSON）をキャッシュに保存します（Redis には TTL 付き）。"""
+    _local_cache_put(key, data)
+    if not _redis_client:
+        return
+    try:
+        _redis_client.setex(key, _CACHE_TTL_SEC, _json_dumps(data))
+    except Exception as e:
+        logger.warning(f"抽出キャッシュ保存失敗: {e}")
+
+
+def _estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """送信メッセージのトークン数を概算します（約3文字=1トークン + 応答分）。"""
+    return sum(len(m.get("content") or "") for m in messages) // 3 + COMPLETION_TOKENS_ESTIMATE
+
 # ステータスのエイリアス定義（正規化用）- 最新ルール 2026-01-27
 STATUS_ALIASES = {
     # 休暇（細分化）
@@ -45,6 +231,16 @@ STATUS_ALIASES = {
     "other": {"other", "未分類", "その他"},
 }
 
+# エイリアス → 正規ステータスの逆引き表（import時に1度だけ構築）
+# 同じエイリアスが複数に現れる場合は STATUS_AI_ALIASES の定義順で先のものを優先する
+_ALIAS_TO_CANONICAL: Dict[str, str] = {}
+for _canonical, _aliases in STATUS_AI_ALIASES.items():
+    _ALIAS_TO_CANONICAL.setdefault(_canonical, _canonical)
+    for _alias in _aliases:
+        _ALIAS_TO_CANONICAL.setdefault(_alias.lower(), _canonical)
+del _canonical, _aliases, _alias
+
+
 def _normalize_status(value: str) -> str:
     """
     ステータス値を正規化します。
@@ -57,21 +253,113 @@ def _normalize_status(value: str) -> str:
         
     Note:
         エイリアスに該当しない場合は "other" を返します。
+        部分一致は行いません（「午前在宅」が午前休になるなどの誤判定を避けるため）。
     """
-    val = str(value).lower().strip()
-    
-    # 1. まず完全一致を確認（AIが返した status をそのまま使う）
-    for canonical in STATUS_AI_ALIASES.keys():
-        if val == canonical:
-            return canonical
-    # 2. 次に、日本語キーワードなどのエイリアスに含まれているか確認
-    # 詳細なステータス（vacation_am等）から先にチェックされるように
-    # STATUS_AI_ALIASES の定義順も重要です
-    for canonical, aliases in STATUS_AI_ALIASES.items():
-        if val in aliases or any(a == val for a in aliases):
+    # AIは通常、正規ステータス（小文字の英語キー）をそのまま返すため、まず加工せずに引く
+    if isinstance(value, str):
+        canonical = _ALIAS_TO_CANONICAL.get(value)
+        if canonical is not None:
             return canonical
-            
-    return "other"
+    return _ALIAS_TO_CANONICAL.get(str(value).lower().strip(), "other")
+
+
+# 前処理用の正規表現（呼び出しごとのコンパイルキャッシュ参照を避けるため事前コンパイル）
+_MENTION_RE = re.compile(r'<@[A-Z0-9]+>')
+# Slack記法（メンション・打ち消し線・チャンネル・特殊メンション・リンク）を1回の走査で処理するための結合パターン
+# グループ: 1=打ち消し線の中身, 2=チャンネル名, 3=リンクの表示名
+_PREPROCESS_RE = re.compile(
+    r'<@[A-Z0-9]+>'
+    r'|~(.*?)~'
+    r'|<#[A-Z0-9]+(?:\|([^>]*))?>'
+    r'|<![^>]*>'
+    r'|<(?:https?|mailto):[^|>]+(?:\|([^>]*))?>'
+)
+# 連続する空白（全角スペース含む）と空行。改行は複数日の列挙に使われるため残す
+_SPACE_RUN_RE = re.compile(r'[ \t\u3000]{2,}')
+_BLANK_LINES_RE = re.compile(r'\n[ \t\u3000]*(?:\n[ \t\u3000]*)+')
+# AIに渡す本文の最大文字数（勤怠連絡は通常数行のため、長文は末尾を切り捨てる）
+MAX_INPUT_CHARS = 1500
+
+
+def _preprocess_replace(match: "re.Match") -> str:
+    """_PREPROCESS_RE のマッチを置換します（メンション・URLは削除、打ち消し線は注記に、チャンネル・リンクは表示名に変換）。"""
+    struck, channel_name, link_label = match.groups()
+    if struck is not None:
+        return f"(strike-through: {_MENTION_RE.sub('', struck)})"
+    if channel_name:
+        return f"#{channel_name}"
+    if link_label:
+        return link_label
+    return ""
+
+
+def _preprocess_text(text: str) -> str:
+    """
+    AIに渡す前のテキスト前処理を行います。
+
+    - <@UXXXXXXXX> 形式のSlackメンションを削除してAIの誤認（メンションされた人の勤怠と誤解）を防ぐ
+    - Slackの ~text~ 記法を AIが理解しやすい "(strike-through: text)" 形式に変換
+    - チャンネル・リンク記法は表示名のみ残し、URLや特殊メンション（<!here> など）は削除
+    - 連続する空白と空行を詰めてトークン数を減らす
+    """
+    # Slack記法を含まない大半のメッセージは置換用の正規表現を通さない
+    if "<" in text or "~" in text:
+        text = _PREPROCESS_RE.sub(_preprocess_replace, text)
+    if "  " in text or "\t" in text or "\u3000" in text:
+        text = _SPACE_RUN_RE.sub(" ", text)
+    if "\n" in text:
+        text = _BLANK_LINES_RE.sub("\n", text)
+    return text.strip()
+
+
+def _truncate_for_prompt(text: str) -> str:
+    """本文を MAX_INPUT_CHARS 文字までに切り詰めます（トークン数・コストの上限を抑えるため）。"""
+    if len(text) <= MAX_INPUT_CHARS:
+        return text
+    logger.info(f"AI入力を切り詰めました: {len(text)} -> {MAX_INPUT_CHARS}文字")
+    return text[:MAX_INPUT_CHARS]
+
+# 定型文の高速判定（AIを呼ばずに確定できる短いメッセージ）
+# 日付・時刻・複数行・矢印などを含むものは対象外とし、曖昧な入力は必ずAIに回す
+_FAST_PATH_STATUS = {
+    "在宅": "remote", "在宅勤務": "remote", "リモート": "remote", "リモート勤務": "remote", "テレワーク": "remote",
+    "有給": "vacation", "有給休暇": "vacation", "全休": "vacation", "休暇": "vacation", "お休み": "vacation",
+    "午前休": "vacation_am", "午前半休": "vacation_am", "am休": "vacation_am",
+    "午後休": "vacation_pm", "午後半休": "vacation_pm", "pm休": "vacation_pm",
+}
+_FAST_PATH_RE = re.compile(
+    r'(?:(?:本日|今日)は?)?'
+    r'(' + '|'.join(sorted(map(re.escape, _FAST_PATH_STATUS), key=len, reverse=True)) + r')'
+    r'(?:です|します|いたします|となります|でお願いします|をいただきます)?[。．.!！]*',
+    re.IGNORECASE,
+)
+
+
+def _fast_path_extract(clean_text: str, base_iso: str) -> Optional[Dict[str, Any]]:
+    """
+    定型的な短いメッセージ（「本日在宅」「有給です」など）をAIを使わずに判定します。
+
+    Args:
+        clean_text: 前処理済みのメッセージ
+        base_iso: 基準日（YYYY-MM-DD形式）
+
+    Returns:
+        extract_attendance_from_text と同じ形式の辞書。定型文に完全一致しない場合は None
+    """
+    match = _FAST_PATH_RE.fullmatch(clean_text)
+    if not match:
+        return None
+    return {
+        "date": base_iso,
+        "status": _FAST_PATH_STATUS[match.group(1).lower()],
+        "note": "",
+        "action": "save",
+        "target_email": None,
+    }
+
+
+# 「備考なし」とみなすAIの出力
+_NULL_NOTE_TOKENS = frozenset({"none", "null", "nan", ""})
 
 
 def _format_note(att_data: Dict) -> str:
@@ -90,12 +378,402 @@ def _format_note(att_data: Dict) -> str:
         現在は削除されています。
     """
     ai_note = att_data.get("note")
-    
-    # AIが "None", "null" と返してきた場合や、空の場合は空文字を返す
-    if not ai_note or str(ai_note).lower() in ["none", "null"]:
+    if not ai_note:
         return ""
-    
-    return str(ai_note).strip()
+
+    # AIが "None", "null" と返してきた場合や、空白のみの場合は空文字を返す
+    note = ai_note.strip() if isinstance(ai_note, str) else str(ai_note).strip()
+    return "" if note.lower() in _NULL_NOTE_TOKENS else note
+
+def _format_result(att: Dict, base_iso: str) -> Dict[str, Any]:
+    """
+    AIの抽出結果1件を返却形式に整形します。
+
+    Args:
+        att: AIの抽出結果（attendances の1要素）
+        base_iso: 日付が欠落している場合に補完する基準日（YYYY-MM-DD形式）
+
+    Returns:
+        {"date", "status", "note", "action"} の辞書
+    """
+    # 日付の補完（AIが返さなかった場合は基準日を使用）
+    target_date = att.get("date")
+    if not target_date or len(target_date) < 10:
+        target_date = base_iso
+
+    return {
+        "date": target_date,
+        "status": _normalize_status(att.get("status", "other")),
+        "note": _format_note(att),
+        "action": att.get("action", "save")
+    }
+
+
+# 使用モデル（最新の安定版を明示的に指定）
+_MODEL_NAME = "gpt-4o-mini-2024-07-18"
+
+# システム指示の定義（最新ルール 2026-01-28: 実例ベース最適化版 + target_user_id）
+_SYSTEM_INSTRUCTION = (
+    "You are an attendance data extractor. Output JSON only.\n"
+    "Format: {\"is_attendance\": bool, \"target_email\": \"email or null\", \"attendances\": [{\"date\": \"YYYY-MM-DD\", \"status\": \"string\", \"note\": \"string\", \"action\": \"save\"|\"delete\"}]}\n\n"
+    "Use target_email (not target_user_id). Email is the primary identifier for cross-workspace users.\n\n"
+
+    "CORE RULES:\n"
+    "1. PLAIN '出社': If message says just '出社' (e.g., '1/26...出社') -> action='delete' (returning to normal work)\n"
+    "2. '変更' KEYWORD: '変更' means UPDATE, not delete. Always action='save' when '変更' is mentioned.\n"
+    "3. ARROW (A->B): Extract ONLY B. Ignore A completely. Always action='save' unless B='出社'.\n"
+    "   - If B='出社' -> action='delete'\n"
+    "   - If B is any other status (even if A and B are similar) -> Extract B's status, action='save'\n"
+    "   - Examples: '在宅→在宅(早退)' -> Extract '在宅(早退)', action='save'\n"
+    "4. DATE EXTRACTION: If date is explicitly written (e.g., '1/23(金)'), use that date. Ignore relative dates like '明日' in this case.\n"
+    "5. LATENESS DETECTION - CRITICAL:\n"
+    "   - '〜後に出社/〜してから出社/終わり次第向かう/向かいます' -> status='late'\n"
+    "   - Time specified (e.g., '10時出社', '十時出社') -> status='late' and MUST include time in note\n"
+    "   - Always extract and preserve time information in note (e.g., '体調不良（10時出社）')\n"
+    "6. SAME DAY MULTIPLE STATUSES - CRITICAL:\n"
+    "   - If ONE day has multiple statuses/events (e.g., '在宅' + '中抜け'), create ONLY ONE record\n"
+    "   - Use status='other' and combine all details in note (e.g., '在宅（11時から1時間中抜け）')\n"
+    "   - NEVER create multiple records for the same date\n"
+    "7. AFTERNOON ATTENDANCE: '午後から出社/午後出社' -> status='vacation_am' OR status='other' with note='午後出社予定'\n"
+    "8. VAGUE EXPRESSIONS: If uncertain timing (e.g., '午前は病院。出社したら報告') -> status='other', include all context in note\n"
+    "9. NOTE EXTRACTION:\n"
+    "   - Main reason: Extract core cause concisely\n"
+    "   - Time details: ALWAYS include if mentioned (e.g., '10時出社', '11時から1時間中抜け')\n"
+    "   - Secondary info: Put in parentheses (e.g., '体調不良（10時出社）', '在宅（昼休憩13:00〜14:00）')\n"
+    "10. HEALTH: Format as '体調不良(症状/時間)'\n"
+    "11. CANCELLATION: '取消/キャンセル/取り消し/削除' -> action='delete'. "
+    "Also '間に合った/間に合いました/間に合ってます/間に合っています/間に合ってる' (made it in time despite lateness) -> action='delete'. "
+    "'変更' is NOT cancellation.\n"
+    "12. TARGET PERSON: When the message clearly refers to ANOTHER person's attendance (e.g. '荒木課長 在宅', '荒木さんの勤怠'), set target_email to that person's email from the 'Workspace users' list. When the message is about the sender's own attendance, set target_email to null. Always use email (not user_id) for cross-workspace identity.\n\n"
+
+    "STATUS:\n"
+    "- vacation/vacation_am/vacation_pm/vacation_hourly: Leave\n"
+    "- out: Specific location (e.g., '九段下')\n"
+    "- late_delay: Train delay | late: General lateness\n"
+    "- remote: Work from home\n"
+    "- early_leave: Leave early\n"
+    "- other: Mixed states, vague expressions, or uncertain timing\n"
+)
+
+# Few-shot examples（実例ベース：ユーザーの実際の使用パターンに基づく）
+_FEW_SHOT_EXAMPLES = [
+    # 例1: 運転見合わせで在宅（重要情報を簡潔に）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: おはようございます。最寄り駅から運転見合わせており、出社が大幅に遅れると予想されるため本日在宅勤務に切り替えさせていただきます。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "remote", "note": "最寄り駅運転見合わせのため", "action": "save"}]}'
+    },
+    # 例2: 複数日+出社（出社は削除）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-25 (Saturday)\nText: 直前で恐縮ですが勤怠を下記の通りとさせて下さい\n1/26...出社\n1/27...午前中在宅/午後出社\n1/30...午後在宅(社用の為)"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-26", "status": "other", "note": "予定変更", "action": "delete"}, {"date": "2026-01-27", "status": "other", "note": "AM在宅/PM出社", "action": "save"}, {"date": "2026-01-30", "status": "other", "note": "AM出社/PM在宅(社用の為)", "action": "save"}]}'
+    },
+    # 例3: 矢印記法（在宅→在宅(早退)への変更、日付明示）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-22 (Thursday)\nText: 直前の連絡となり申し訳ございませんが、自社都合により明日の勤怠を以下の通り変更いたします。\n1/23(金)\n在宅(通常勤務) → 在宅(16:30早退)\n勤怠一覧は更新済みです。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-23", "status": "other", "note": "在宅(16:30早退)", "action": "save"}]}'
+    },
+    # 例4: 在宅に変更（メイン情報+補足情報）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: おはようございます。本日自社都合で在宅勤務に変更させてください。また、昼休憩を13時〜14時で取ります。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "remote", "note": "自社都合（昼休憩13:00〜14:00）", "action": "save"}]}'
+    },
+    # 例5: 午後出社（午前休または詳細記載）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 本日、家族の通院のため午後から出社します。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "vacation_am", "note": "家族の通院", "action": "save"}]}'
+    },
+    # 例6: 曖昧な表現（午前は病院だが出社時刻不明）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 明日(1/29)の午前は病院に行ってきます。(出社したら、再度ご報告させて頂きます。)"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-29", "status": "other", "note": "午前は病院。出社したら、再度報告", "action": "save"}]}'
+    },
+    # 例7: インフルエンザで複数日在宅
+    {
+        "role": "user",
+        "content": "Today: 2026-01-27 (Monday)\nText: インフルエンザB型と診断されたため、1/27(火)〜1/29(木) 出社→在宅勤務"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-27", "status": "remote", "note": "体調不良(インフルエンザB型)", "action": "save"}, {"date": "2026-01-28", "status": "remote", "note": "体調不良(インフルエンザB型)", "action": "save"}, {"date": "2026-01-29", "status": "remote", "note": "体調不良(インフルエンザB型)", "action": "save"}]}'
+    },
+    # 例8: 出社→全休
+    {
+        "role": "user",
+        "content": "Today: 2026-01-27 (Monday)\nText: 1/30(金) 出社→全休（所用の為）"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-30", "status": "vacation", "note": "所用", "action": "save"}]}'
+    },
+    # 例9: 在宅→出社（削除）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-27 (Monday)\nText: 1/31(土) 在宅 -> 出社"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-31", "status": "other", "note": "予定変更", "action": "delete"}]}'
+    },
+    # 例10: 取消
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 明日の早退は取消します"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-29", "status": "other", "note": "早退取消", "action": "delete"}]}'
+    },
+    # 例11: 電車遅延
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 電車遅延で遅刻します"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late_delay", "note": "", "action": "save"}]}'
+    },
+    # 例12: 病院後に出社（終わり次第向かう=遅刻）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 子どもの病院に時間がかかっており、終わり次第向かいます。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late", "note": "子どもの病院に時間がかかっている", "action": "save"}]}'
+    },
+    # 例13: 時間指定の遅刻（時間を必ず記載）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 体調不良の為、10時出社とさせてください。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late", "note": "体調不良（10時出社）", "action": "save"}]}'
+    },
+    # 例14: 時間指定の遅刻（漢数字）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 朝から体調が優れず、十時出社とさせて下さい。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late", "note": "体調不良（10時出社）", "action": "save"}]}'
+    },
+    # 例15: 同日に複数の情報（在宅+中抜け）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-29 (Wednesday)\nText: 急遽所用のため在宅とさせてください。また11時から1時間程度中抜けします。"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-29", "status": "other", "note": "在宅（11時から1時間程度中抜け）", "action": "save"}]}'
+    },
+    # 例16: 「間に合っています」= 遅刻・遅延報告の取り消し
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 間に合っています"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "target_email": null, "attendances": [{"date": "2026-01-28", "status": "other", "note": "遅刻取消", "action": "delete"}]}'
+    },
+    # 例17: 「間に合ってます」= 遅刻・遅延報告の取り消し（口語短縮形）
+    {
+        "role": "user",
+        "content": "Today: 2026-01-28 (Tuesday)\nText: 間に合ってます"
+    },
+    {
+        "role": "assistant",
+        "content": '{"is_attendance": true, "target_email": null, "attendances": [{"date": "2026-01-28", "status": "other", "note": "遅刻取消", "action": "delete"}]}'
+    }
+]
+
+
+def _resolve_base_date(message_ts: Optional[str] = None):
+    """
+    「明日」などの相対表現を解釈する基準日を決定します。
+
+    Args:
+        message_ts: Slackメッセージのタイムスタンプ（指定時はその日付を基準にする）
+
+    Returns:
+        (weekday_str, iso_str) のタプル
+    """
+    if message_ts:
+        try:
+            # Slackのタイムスタンプ（Unix時間）をdatetimeに変換
+            base_date = datetime.datetime.fromtimestamp(float(message_ts)).date()
+            logger.info(f"基準日をメッセージのタイムスタンプから設定: {base_date} (ts={message_ts})")
+            return base_date.strftime('%A'), base_date.isoformat()
+        except (ValueError, TypeError) as e:
+            logger.warning(f"message_tsの変換に失敗、今日を基準日とします: {e}")
+    _, weekday, iso = _today_label()
+    return weekday, iso
+
+
+@functools.lru_cache(maxsize=None)
+def _client_for_key(api_key: str):
+    """APIキーごとに OpenAI クライアントを1つだけ生成します（HTTP接続プールを使い回すため）。"""
+    return OpenAI(api_key=api_key)
+
+
+def _get_client():
+    """
+    共有の OpenAI クライアントを返します。
+
+    Returns:
+        OpenAI クライアント。APIキー未設定または openai 未インストールの場合は None
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key or not OpenAI:
+        return None
+    return _client_for_key(api_key)
+
+
+# JSONとして解釈できない応答を受けた場合に、エラー内容を添えて再要求する回数
+JSON_RETRY_LIMIT = 2
+
+
+def _create_response(
+    client,
+    messages: List[Dict[str, str]],
+    team_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> str:
+    """
+    OpenAI API を1回呼び出し、応答テキストを返します（レート制限待機とコストログを含む）。
+    """
+    # TPM上限を超えないよう、送信前にトークンを確保（不足時は待機）
+    waited = _rate_limiter.acquire(_estimate_tokens(messages))
+    if waited > 0:
+        logger.info(f"OpenAIレート制限待機: {waited:.2f}秒")
+
+    # Responses API で送信（system + few-shot を先頭に固定し、prompt_cache_key でサーバー側のプレフィックスキャッシュを効かせる）
+    response = client.responses.create(
+        model=_MODEL_NAME,
+        input=messages,
+        text={"format": {"type": "json_object"}},
+        temperature=0.0,  # 0.1 -> 0.0 に変更（より一貫性のある出力）
+        prompt_cache_key=_PROMPT_CACHE_KEY,
+    )
+
+    # OpenAI APIコストのログ出力
+    usage = response.usage
+    if usage:
+        details = getattr(usage, "input_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) if details else 0
+        if cached_tokens:
+            logger.info(f"OpenAIプロンプトキャッシュヒット: {cached_tokens}/{usage.input_tokens}トークン")
+        log_openai_cost(
+            logger=logger,
+            prompt_tokens=usage.input_tokens,
+            completion_tokens=usage.output_tokens,
+            total_tokens=usage.total_tokens,
+            model=_MODEL_NAME,
+            team_id=team_id,
+            user_id=user_id
+        )
+
+    return response.output_text
+
+
+def _request_completion(
+    messages: List[Dict[str, str]],
+    team_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    OpenAI API を呼び出し、JSON応答をパースして返します。
+
+    応答がJSONオブジェクトとして解釈できない場合は、直前の出力とエラー内容を
+    会話に追加して最大 JSON_RETRY_LIMIT 回まで再要求します。
+
+    Args:
+        messages: Responses API の input に渡すメッセージ配列（role / content）
+        team_id: ワークスペースID（コストログ用、オプション）
+        user_id: ユーザーID（コストログ用、オプション）
+
+    Returns:
+        パース済みのJSON（辞書）
+
+    Raises:
+        Exception: API呼び出しに失敗した場合、または再要求してもJSONを得られなかった場合
+    """
+    client = _get_client()
+    if client is None:
+        raise RuntimeError("OpenAI クライアントを初期化できません（API_KEY未設定または openai 未インストール）")
+
+    conversation = list(messages)
+    for attempt in range(JSON_RETRY_LIMIT + 1):
+        raw = _create_response(client, conversation, team_id=team_id, user_id=user_id)
+        try:
+            data = _json_loads(raw)
+            if not isinstance(data, dict):
+                raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+            return data
+        except ValueError as e:  # json.JSONDecodeError は ValueError のサブクラス
+            if attempt >= JSON_RETRY_LIMIT:
+                raise
+            logger.warning(f"AI応答のJSONパースに失敗したため再要求します（{attempt + 1}/{JSON_RETRY_LIMIT}）: {e}")
+            conversation += [
+                {"role": "assistant", "content": raw or ""},
+                {"role": "user", "content": f"Your last output was not a valid JSON object ({e}). Output the valid JSON object only."},
+            ]
+            time.sleep(0.5 * (attempt + 1))
+
+
+def _build_final_result(data: Dict[str, Any], base_iso: str) -> Optional[Dict[str, Any]]:
+    """
+    AIの応答（JSON）を extract_attendance_from_text の返却形式に変換します。
+
+    Args:
+        data: AIの応答（{"is_attendance", "target_email", "attendances"}）
+        base_iso: 日付が欠落している場合に補完する基準日（YYYY-MM-DD形式）
+
+    Returns:
+        返却形式の辞書。attendances が空の場合は None
+    """
+    attendances = data.get("attendances")
+    if not attendances:
+        return None
+
+    # 全てのデータを整形
+    results = [_format_result(a, base_iso) for a in attendances]
+
+    # 返却形式: 1件目をベースにし、2件目以降を _additional_attendances に入れる
+    final_result = results[0]
+    if len(results) > 1:
+        final_result["_additional_attendances"] = results[1:]
+
+    # 誰の勤怠か（メッセージ内に他人の名前がある場合にAIが設定。email を主キーとして使用）
+    raw_email = data.get("target_email")
+    final_result["target_email"] = (raw_email if raw_email and str(raw_email).strip() else None)
+    return final_result
+
 
 def extract_attendance_from_text(
     text: str,
@@ -138,243 +816,26 @@ def extract_attendance_from_text(
         - thread_context 指定時は「やり取りから最終的な出勤ステータスを判定」するプロンプトで送る
     """
     logger.info(f"DEBUG_AI_INPUT: [{text}] (type: {type(text)})")
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not text or not api_key or not OpenAI:
+    if not text or _get_client() is None:
         logger.warning("AI抽出がスキップされました（API_KEYまたはテキストが空）")
         return None
 
-    # 【メンション削除前処理】
-    # <@UXXXXXXXX> 形式のSlackメンションを削除してAIの誤認（メンションされた人の勤怠と誤解）を防ぐ
-    clean_text = re.sub(r'<@[A-Z0-9]+>', '', text).strip()
-    if thread_context:
-        thread_context = re.sub(r'<@[A-Z0-9]+>', '', thread_context).strip()
-
-    # 【打ち消し線の前処理】
-    # Slackの ~text~ 記法を AIが理解しやすい形式に変換
-    clean_text = re.sub(r'~(.*?)~', r'(strike-through: \1)', clean_text)
+    # 【メンション削除・打ち消し線の前処理】
+    clean_text = _truncate_for_prompt(_preprocess_text(text))
     if thread_context:
-        thread_context = re.sub(r'~(.*?)~', r'(strike-through: \1)', thread_context)
+        thread_context = _preprocess_text(thread_context)
 
-    client = OpenAI(api_key=api_key)
-    
     # 基準日の決定：message_tsがある場合はそれを基準に、なければ今日
-    if message_ts:
-        try:
-            # Slackのタイムスタンプ（Unix時間）をdatetimeに変換
-            ts_float = float(message_ts)
-            base_datetime = datetime.datetime.fromtimestamp(ts_float)
-            base_date = base_datetime.date()
-            logger.info(f"基準日をメッセージのタイムスタンプから設定: {base_date} (ts={message_ts})")
-        except (ValueError, TypeError) as e:
-            logger.warning(f"message_tsの変換に失敗、今日を基準日とします: {e}")
-            base_date = datetime.date.today()
-    else:
-        base_date = datetime.date.today() 
-    
-    try:
-        # システム指示の定義（最新ルール 2026-01-28: 実例ベース最適化版 + target_user_id）
-        system_instruction = (
-            "You are an attendance data extractor. Output JSON only.\n"
-            "Format: {\"is_attendance\": bool, \"target_email\": \"email or null\", \"attendances\": [{\"date\": \"YYYY-MM-DD\", \"status\": \"string\", \"note\": \"string\", \"action\": \"save\"|\"delete\"}]}\n\n"
-            "Use target_email (not target_user_id). Email is the primary identifier for cross-workspace users.\n\n"
-
-            "CORE RULES:\n"
-            "1. PLAIN '出社': If message says just '出社' (e.g., '1/26...出社') -> action='delete' (returning to normal work)\n"
-            "2. '変更' KEYWORD: '変更' means UPDATE, not delete. Always action='save' when '変更' is mentioned.\n"
-            "3. ARROW (A->B): Extract ONLY B. Ignore A completely. Always action='save' unless B='出社'.\n"
-            "   - If B='出社' -> action='delete'\n"
-            "   - If B is any other status (even if A and B are similar) -> Extract B's status, action='save'\n"
-            "   - Examples: '在宅→在宅(早退)' -> Extract '在宅(早退)', action='save'\n"
-            "4. DATE EXTRACTION: If date is explicitly written (e.g., '1/23(金)'), use that date. Ignore relative dates like '明日' in this case.\n"
-            "5. LATENESS DETECTION - CRITICAL:\n"
-            "   - '〜後に出社/〜してから出社/終わり次第向かう/向かいます' -> status='late'\n"
-            "   - Time specified (e.g., '10時出社', '十時出社') -> status='late' and MUST include time in note\n"
-            "   - Always extract and preserve time information in note (e.g., '体調不良（10時出社）')\n"
-            "6. SAME DAY MULTIPLE STATUSES - CRITICAL:\n"
-            "   - If ONE day has multiple statuses/events (e.g., '在宅' + '中抜け'), create ONLY ONE record\n"
-            "   - Use status='other' and combine all details in note (e.g., '在宅（11時から1時間中抜け）')\n"
-            "   - NEVER create multiple records for the same date\n"
-            "7. AFTERNOON ATTENDANCE: '午後から出社/午後出社' -> status='vacation_am' OR status='other' with note='午後出社予定'\n"
-            "8. VAGUE EXPRESSIONS: If uncertain timing (e.g., '午前は病院。出社したら報告') -> status='other', include all context in note\n"
-            "9. NOTE EXTRACTION:\n"
-            "   - Main reason: Extract core cause concisely\n"
-            "   - Time details: ALWAYS include if mentioned (e.g., '10時出社', '11時から1時間中抜け')\n"
-            "   - Secondary info: Put in parentheses (e.g., '体調不良（10時出社）', '在宅（昼休憩13:00〜14:00）')\n"
-            "10. HEALTH: Format as '体調不良(症状/時間)'\n"
-            "11. CANCELLATION: '取消/キャンセル/取り消し/削除' -> action='delete'. "
-            "Also '間に合った/間に合いました/間に合ってます/間に合っています/間に合ってる' (made it in time despite lateness) -> action='delete'. "
-            "'変更' is NOT cancellation.\n"
-            "12. TARGET PERSON: When the message clearly refers to ANOTHER person's attendance (e.g. '荒木課長 在宅', '荒木さんの勤怠'), set target_email to that person's email from the 'Workspace users' list. When the message is about the sender's own attendance, set target_email to null. Always use email (not user_id) for cross-workspace identity.\n\n"
-
-            "STATUS:\n"
-            "- vacation/vacation_am/vacation_pm/vacation_hourly: Leave\n"
-            "- out: Specific location (e.g., '九段下')\n"
-            "- late_delay: Train delay | late: General lateness\n"
-            "- remote: Work from home\n"
-            "- early_leave: Leave early\n"
-            "- other: Mixed states, vague expressions, or uncertain timing\n"
-        )
+    base_weekday, base_iso = _resolve_base_date(message_ts)
 
-        # API呼び出し
-        model_name = "gpt-4o-mini-2024-07-18"  # 最新の安定版を明示的に指定
-        
-        # Few-shot examples（実例ベース：ユーザーの実際の使用パターンに基づく）
-        few_shot_examples = [
-            # 例1: 運転見合わせで在宅（重要情報を簡潔に）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: おはようございます。最寄り駅から運転見合わせており、出社が大幅に遅れると予想されるため本日在宅勤務に切り替えさせていただきます。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "remote", "note": "最寄り駅運転見合わせのため", "action": "save"}]}'
-            },
-            # 例2: 複数日+出社（出社は削除）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-25 (Saturday)\nText: 直前で恐縮ですが勤怠を下記の通りとさせて下さい\n1/26...出社\n1/27...午前中在宅/午後出社\n1/30...午後在宅(社用の為)"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-26", "status": "other", "note": "予定変更", "action": "delete"}, {"date": "2026-01-27", "status": "other", "note": "AM在宅/PM出社", "action": "save"}, {"date": "2026-01-30", "status": "other", "note": "AM出社/PM在宅(社用の為)", "action": "save"}]}'
-            },
-            # 例3: 矢印記法（在宅→在宅(早退)への変更、日付明示）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-22 (Thursday)\nText: 直前の連絡となり申し訳ございませんが、自社都合により明日の勤怠を以下の通り変更いたします。\n1/23(金)\n在宅(通常勤務) → 在宅(16:30早退)\n勤怠一覧は更新済みです。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-23", "status": "other", "note": "在宅(16:30早退)", "action": "save"}]}'
-            },
-            # 例4: 在宅に変更（メイン情報+補足情報）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: おはようございます。本日自社都合で在宅勤務に変更させてください。また、昼休憩を13時〜14時で取ります。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "remote", "note": "自社都合（昼休憩13:00〜14:00）", "action": "save"}]}'
-            },
-            # 例5: 午後出社（午前休または詳細記載）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 本日、家族の通院のため午後から出社します。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "vacation_am", "note": "家族の通院", "action": "save"}]}'
-            },
-            # 例6: 曖昧な表現（午前は病院だが出社時刻不明）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 明日(1/29)の午前は病院に行ってきます。(出社したら、再度ご報告させて頂きます。)"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-29", "status": "other", "note": "午前は病院。出社したら、再度報告", "action": "save"}]}'
-            },
-            # 例7: インフルエンザで複数日在宅
-            {
-                "role": "user",
-                "content": "Today: 2026-01-27 (Monday)\nText: インフルエンザB型と診断されたため、1/27(火)〜1/29(木) 出社→在宅勤務"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-27", "status": "remote", "note": "体調不良(インフルエンザB型)", "action": "save"}, {"date": "2026-01-28", "status": "remote", "note": "体調不良(インフルエンザB型)", "action": "save"}, {"date": "2026-01-29", "status": "remote", "note": "体調不良(インフルエンザB型)", "action": "save"}]}'
-            },
-            # 例8: 出社→全休
-            {
-                "role": "user",
-                "content": "Today: 2026-01-27 (Monday)\nText: 1/30(金) 出社→全休（所用の為）"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-30", "status": "vacation", "note": "所用", "action": "save"}]}'
-            },
-            # 例9: 在宅→出社（削除）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-27 (Monday)\nText: 1/31(土) 在宅 -> 出社"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-31", "status": "other", "note": "予定変更", "action": "delete"}]}'
-            },
-            # 例10: 取消
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 明日の早退は取消します"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-29", "status": "other", "note": "早退取消", "action": "delete"}]}'
-            },
-            # 例11: 電車遅延
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 電車遅延で遅刻します"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late_delay", "note": "", "action": "save"}]}'
-            },
-            # 例12: 病院後に出社（終わり次第向かう=遅刻）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 子どもの病院に時間がかかっており、終わり次第向かいます。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late", "note": "子どもの病院に時間がかかっている", "action": "save"}]}'
-            },
-            # 例13: 時間指定の遅刻（時間を必ず記載）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 体調不良の為、10時出社とさせてください。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late", "note": "体調不良（10時出社）", "action": "save"}]}'
-            },
-            # 例14: 時間指定の遅刻（漢数字）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 朝から体調が優れず、十時出社とさせて下さい。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-28", "status": "late", "note": "体調不良（10時出社）", "action": "save"}]}'
-            },
-            # 例15: 同日に複数の情報（在宅+中抜け）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-29 (Wednesday)\nText: 急遽所用のため在宅とさせてください。また11時から1時間程度中抜けします。"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "attendances": [{"date": "2026-01-29", "status": "other", "note": "在宅（11時から1時間程度中抜け）", "action": "save"}]}'
-            },
-            # 例16: 「間に合っています」= 遅刻・遅延報告の取り消し
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 間に合っています"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "target_email": null, "attendances": [{"date": "2026-01-28", "status": "other", "note": "遅刻取消", "action": "delete"}]}'
-            },
-            # 例17: 「間に合ってます」= 遅刻・遅延報告の取り消し（口語短縮形）
-            {
-                "role": "user",
-                "content": "Today: 2026-01-28 (Tuesday)\nText: 間に合ってます"
-            },
-            {
-                "role": "assistant",
-                "content": '{"is_attendance": true, "target_email": null, "attendances": [{"date": "2026-01-28", "status": "other", "note": "遅刻取消", "action": "delete"}]}'
-            }
-        ]
-        
+    # 定型文はAIを呼ばずに確定（スレッド返信は文脈判断が必要なため対象外）
+    if not thread_context:
+        fast_result = _fast_path_extract(clean_text, base_iso)
+        if fast_result is not None:
+            logger.info(f"定型文判定: status={fast_result['status']}")
+            return fast_result
+
+    try:
         # スレッド返信時は「やり取りから最終的な出勤ステータスを判定」する形でユーザーメッセージを構成
         if thread_context:
             user_content = (
@@ -386,10 +847,10 @@ def extract_attendance_from_text(
                 "（例: 親で遅刻予定、返信で「間に合いました」なら出社/遅刻取り消しとして扱う）\n\n"
                 "【やり取り】\n"
                 f"{thread_context}\n\n"
-                f"Today: {base_date} ({base_date.strftime('%A')})"
+                f"Today: {base_iso} ({base_weekday})"
             )
         else:
-            user_content = f"Today: {base_date} ({base_date.strftime('%A')})\nText: {clean_text}"
+            user_content = f"Today: {base_iso} ({base_weekday})\nText: {clean_text}"
 
         # ワークスペースユーザー一覧を渡す場合（誰の勤怠かを判定するため。email を主キーとして使用）
         if workspace_user_list:
@@ -403,75 +864,198 @@ def extract_attendance_from_text(
             user_content = user_content + "\n\n" + "\n".join(lines)
 
         messages = [
-            {"role": "system", "content": system_instruction},
-            *few_shot_examples,  # Few-shot examplesを挿入
+            {"role": "system", "content": _SYSTEM_INSTRUCTION},
+            *_FEW_SHOT_EXAMPLES,  # Few-shot examplesを挿入
             {"role": "user", "content": user_content},
         ]
         
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            response_format={"type": "json_object"},
-            temperature=0.0  # 0.1 -> 0.0 に変更（より一貫性のある出力）
-        )
-
-        # OpenAI APIコストのログ出力
-        usage = response.usage
-        if usage:
-            log_openai_cost(
-                logger=logger,
-                prompt_tokens=usage.prompt_tokens,
-                completion_tokens=usage.completion_tokens,
-                total_tokens=usage.total_tokens,
-                model=model_name,
-                team_id=team_id,
-                user_id=user_id
-            )
+        # 同一入力の結果がキャッシュにあればAPIを呼ばない
+        cache_key = _cache_key(_MODEL_NAME, base_iso, user_content)
+        data = _cache_get(cache_key)
+        if data is not None:
+            logger.info("AI抽出キャッシュヒット")
+        else:
+            data = _request_completion(messages, team_id=team_id, user_id=user_id)
+            _cache_set(cache_key, data)
 
-        data = json.loads(response.choices[0].message.content)
-        
-        # attendancesが存在しない場合は抽出失敗
-        if not data.get("attendances"):
+        final_result = _build_final_result(data, base_iso)
+        if final_result is None:
             logger.info("AI抽出結果: 勤怠情報なし")
             return None
 
-        attendances = data["attendances"]
-        
-        def format_result(att):
-            """抽出結果を整形する内部関数"""
-            # 日付の補完（AIが返さなかった場合は今日を使用）
-            target_date = att.get("date")
-            if not target_date or len(target_date) < 10:
-                target_date = base_date.isoformat()
-                
-            return {
-                "date": target_date,
-                "status": _normalize_status(att.get("status", "other")),
-                "note": _format_note(att),
-                "action": att.get("action", "save")
-            }
-
-        # 全てのデータを整形
-        results = [format_result(a) for a in attendances]
-        
-        if not results:
-            return None
+        logger.info(f"AI抽出成功: {1 + len(final_result.get('_additional_attendances', []))}件の勤怠情報を抽出")
+        return final_result
 
-        # 返却形式: 1件目をベースにし、2件目以降を _additional_attendances に入れる
-        final_result = results[0]
-        if len(results) > 1:
-            final_result["_additional_attendances"] = results[1:]
+    except Exception as e:
+        _log_extraction_error(e, team_id=team_id, user_id=user_id)
+        return None
 
-        # 誰の勤怠か（メッセージ内に他人の名前がある場合にAIが設定。email を主キーとして使用）
-        raw_email = data.get("target_email")
-        final_result["target_email"] = (raw_email if raw_email and str(raw_email).strip() else None)
 
-        logger.info(f"AI抽出成功: {len(results)}件の勤怠情報を抽出")
-        return final_result
+# 一括抽出の既定の件数（1回のAPI呼び出しに含めるメッセージ数）
+BATCH_EXTRACTION_SIZE = 10
+# 1件ずつ抽出する場合の同時実行数
+EXTRACTION_MAX_WORKERS = 4
+
+_BATCH_INSTRUCTION = (
+    "\nBATCH MODE:\n"
+    "The user message contains multiple numbered messages. Each message has its own 'Today' date; "
+    "apply all rules above to each message independently, using that message's date.\n"
+    "Output: {\"results\": [{\"index\": int, \"is_attendance\": bool, \"target_email\": null, "
+    "\"attendances\": [...]}]} with exactly one entry per message, in the same order.\n"
+)
 
+# 一括抽出の出力形式（{"results": [...]}）を示す例。単体形式の例だけでは単体形式で返されやすいため追加する
+_BATCH_FEW_SHOT_EXAMPLES = [
+    {
+        "role": "user",
+        "content": (
+            "Messages:\n\n"
+            "1) Today: 2026-01-28 (Tuesday)\nText: 通院のため10時出社します\n\n"
+            "2) Today: 2026-01-28 (Tuesday)\nText: 承知しました！\n\n"
+            "3) Today: 2026-01-29 (Wednesday)\nText: 明日は有給をいただきます"
+        ),
+    },
+    {
+        "role": "assistant",
+        "content": (
+            '{"results": ['
+            '{"index": 1, "is_attendance": true, "target_email": null, "attendances": [{"date": "2026-01-28", "status": "late", "note": "通院（10時出社）", "action": "save"}]}, '
+            '{"index": 2, "is_attendance": false, "target_email": null, "attendances": []}, '
+            '{"index": 3, "is_attendance": true, "target_email": null, "attendances": [{"date": "2026-01-30", "status": "vacation", "note": "", "action": "save"}]}'
+            ']}'
+        ),
+    },
+]
+
+
+def extract_attendance_from_texts(
+    items: List[Dict[str, Any]],
+    team_id: Optional[str] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    複数メッセージの勤怠情報を1回のAPI呼び出しでまとめて抽出します。
+
+    過去ログの遡り処理など、多数のメッセージを順に解析する場合に使用します。
+    スレッド文脈やユーザー一覧を伴わない単体メッセージが対象です。
+
+    Args:
+        items: [{"text": str, "message_ts": str（任意）, "user_id": str（任意）}, ...]
+        team_id: ワークスペースID（コストログ用、オプション）
+
+    Returns:
+        items と同じ順序の抽出結果の配列（各要素は extract_attendance_from_text と同じ形式、抽出できない場合は None）
+
+    Note:
+        定型文判定・抽出キャッシュで確定したメッセージはAIに送らず、残りだけをまとめて抽出します。
+        一括抽出に失敗した場合は、残りを1件ずつ extract_attendance_from_text で抽出し直します。
+    """
+    if not items:
+        return []
+    if _get_client() is None:
+        logger.warning("AI一括抽出がスキップされました（API_KEYが未設定）")
+        return [None] * len(items)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    # 定型文・キャッシュで確定しなかったメッセージだけをまとめてAIに送る
+    pending = []  # [(items内の位置, 基準日, キャッシュキー, プロンプト用の本文), ...]
+    for pos, item in enumerate(items):
+        text = item.get("text") or ""
+        if not text:
+            continue
+        base_weekday, base_iso = _resolve_base_date(item.get("message_ts"))
+        clean_text = _truncate_for_prompt(_preprocess_text(text))
+        fast_result = _fast_path_extract(clean_text, base_iso)
+        if fast_result is not None:
+            results[pos] = fast_result
+            continue
+        # 1件ずつ抽出する場合と同じキーにし、どちらの経路の結果も再利用できるようにする
+        user_content = f"Today: {base_iso} ({base_weekday})\nText: {clean_text}"
+        cache_key = _cache_key(_MODEL_NAME, base_iso, user_content)
+        data = _cache_get(cache_key)
+        if data is not None:
+            try:
+                results[pos] = _build_final_result(data, base_iso)
+                continue
+            except Exception as e:
+                logger.warning(f"抽出キャッシュの値を変換できません（キャッシュミス扱い）: {e}")
+        pending.append((pos, base_iso, cache_key, user_content))
+
+    if not pending:
+        logger.info(f"AI一括抽出: {len(items)}件全てを定型文判定・キャッシュで処理しました")
+        return results
+
+    sections = [
+        f"{idx}) {user_content}"
+        for idx, (_, _, _, user_content) in enumerate(pending, 1)
+    ]
+    messages = [
+        {"role": "system", "content": _SYSTEM_INSTRUCTION + _BATCH_INSTRUCTION},
+        *_FEW_SHOT_EXAMPLES,
+        *_BATCH_FEW_SHOT_EXAMPLES,
+        {"role": "user", "content": "Messages:\n\n" + "\n\n".join(sections)},
+    ]
+
+    try:
+        data = _request_completion(messages, team_id=team_id)
+        by_index = {}
+        for entry in data.get("results") or []:
+            if isinstance(entry, dict) and isinstance(entry.get("index"), int):
+                by_index[entry["index"]] = entry
+        # 番号の欠落・ずれ（0始まり等）があれば対応付けできないため、1件ずつの抽出に切り替える
+        if set(by_index) != set(range(1, len(pending) + 1)):
+            raise ValueError(f"一括抽出の番号不一致: expected=1..{len(pending)}, actual={sorted(by_index)}")
+        batch_results = [
+            _build_final_result(by_index[idx], base_iso)
+            for idx, (_, base_iso, _, _) in enumerate(pending, 1)
+        ]
     except Exception as e:
-        logger.error(f"AI Extraction Error: {e}", exc_info=True)
-        return None
+        _log_extraction_error(e, team_id=team_id)
+        logger.warning(f"AI一括抽出に失敗したため1件ずつ抽出します: {len(pending)}件")
+        # 各抽出は独立したネットワーク待ちのため、スレッドで並行実行する（順序は pending と同じ）
+        pending_items = [items[pos] for pos, _, _, _ in pending]
+        with ThreadPoolExecutor(max_workers=min(len(pending_items), EXTRACTION_MAX_WORKERS)) as executor:
+            fallback_results = executor.map(
+                lambda item: extract_attendance_from_text(
+                    item.get("text") or "",
+                    team_id=team_id,
+                    user_id=item.get("user_id"),
+                    message_ts=item.get("message_ts"),
+                ),
+                pending_items,
+            )
+            for (pos, _, _, _), result in zip(pending, fallback_results):
+                results[pos] = result
+        return results
+
+    for idx, ((pos, _, cache_key, _), result) in enumerate(zip(pending, batch_results), 1):
+        entry = {k: v for k, v in by_index[idx].items() if k != "index"}
+        _cache_set(cache_key, entry)
+        results[pos] = result
+
+    logger.info(
+        f"AI一括抽出成功: {len(items)}件（AI解析 {len(pending)}件）中 "
+        f"{sum(1 for r in results if r)}件から勤怠情報を抽出"
+    )
+    return results
+
+
+def _log_extraction_error(
+    e: Exception,
+    team_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> None:
+    """抽出時の例外をログに記録します。429（レート制限）は抽出エラーと区別して記録します。"""
+    if getattr(e, "status_code", None) == 429:
+        log_structured(
+            logger=logger,
+            level="warning",
+            message="[OPENAI_RATE_LIMIT]",
+            team_id=team_id,
+            user_id=user_id,
+            error=str(e)
+        )
+        return
+    logger.error(f"AI Extraction Error: {e}", exc_info=True)
 
 
 # --- スレッド返信時の削除ガード用（取消・取り消し表現の判定） ---
@@ -11,18 +11,158 @@
 """
 
 import datetime
+import functools
 import logging
-import time
 import os
-from typing import Any, Dict, List, Optional
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
 
-# ステータス翻訳をインポート
-from resources.constants import STATUS_TRANSLATION
 from resources.clients.slack_client import SlackClientWrapper
+from resources.constants import STATUS_TRANSLATION
+from resources.services.group_service import GroupService
+from resources.shared.db import get_global_user_list, get_today_records, get_workspace_config
 from resources.templates.cards import build_attendance_card, build_delete_notification
 
+try:
+    import jpholiday
+except ImportError:
+    jpholiday = None
+
 logger = logging.getLogger(__name__)
 
+# 日次レポートを複数チャンネルへ並行送信する際の最大スレッド数（Slackのレート制限を考慮して控えめに）
+# 空文字は既定値、0以下は1に切り上げる
+REPORT_SEND_MAX_WORKERS = max(1, int(os.getenv("REPORT_SEND_MAX_WORKERS") or "4"))
+
+# 日次レポートの表示用定数（レポートごとに作り直さないようモジュールで1度だけ定義）
+_WEEKDAYS = ("月", "火", "水", "木", "金", "土", "日")
+
+# 表示する区分（divider で区切る単位ごと、区分の定義順）
+# 該当者がいる区分のみ表示し、1件でも表示した単位の後に divider を入れる
+_REPORT_SECTIONS = (
+    ("vacation", "vacation_am", "vacation_pm", "vacation_hourly"),
+    ("late_delay", "late"),
+    ("remote",),
+    ("out",),
+    ("shift",),
+    ("early_leave",),
+    ("other",),
+)
+
+# 区分ごとの見出し部分（"*全休：*\n\t"、表示名は STATUS_TRANSLATION から取得）と divider ブロック。
+# 全グループ・全チャンネルで共有する（ブロックは送信時にシリアライズされるだけで変更されないため、同じ辞書を使い回せる）
+_REPORT_SECTION_HEADERS = tuple(
+    tuple((status_key, f"*{STATUS_TRANSLATION.get(status_key, status_key)}：*\n\t") for status_key in section)
+    for section in _REPORT_SECTIONS
+)
+_DIVIDER_BLOCK = {"type": "divider"}
+
+# Slack の1メッセージあたりのブロック数上限
+_MAX_BLOCKS_PER_MESSAGE = 50
+
+
+# グローバルユーザーリストの索引（email / user_id → 表示名）。
+# 名前解決のたびに全ワークスペースのユーザー一覧を読み込んで線形探索しないよう、TTL付きで保持する
+GLOBAL_USER_INDEX_TTL_SEC = 600
+_global_user_index: Tuple[float, Dict[str, str], Dict[str, str]] = (0.0, {}, {})
+_global_user_index_lock = threading.Lock()
+
+# 日次レポート用の GroupService（Firestoreクライアントをレポートごとに作り直さないよう共有する）
+_group_service: Optional[GroupService] = None
+_group_service_lock = threading.Lock()
+
+
+def _get_group_service() -> GroupService:
+    """共有の GroupService インスタンスを返します（初回呼び出し時に生成）。"""
+    global _group_service
+    with _group_service_lock:
+        if _group_service is None:
+            _group_service = GroupService()
+        return _group_service
+
+
+def _get_global_user_index() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    グローバルユーザーリストから表示名の索引を返します（GLOBAL_USER_INDEX_TTL_SEC 秒キャッシュ）。
+
+    Returns:
+        (email（小文字）→表示名, user_id→表示名) のタプル。
+        同じキーが複数ある場合は、リスト内で先に現れ表示名を持つユーザーを優先します。
+    """
+    global _global_user_index
+    with _global_user_index_lock:
+        built_at, by_email, by_uid = _global_user_index
+        if by_email or by_uid:
+            if time.monotonic() - built_at < GLOBAL_USER_INDEX_TTL_SEC:
+                return by_email, by_uid
+
+        by_email, by_uid = {}, {}
+        for u in get_global_user_list():
+            name = (u.get("display_name") or u.get("real_name") or "").strip()
+            if not name:
+                continue
+            u_email = (u.get("email") or "").strip().lower()
+            if u_email:
+                by_email.setdefault(u_email, name)
+            u_id = u.get("user_id") or ""
+            if u_id:
+                by_uid.setdefault(u_id, name)
+        # 取得失敗（空）の場合はキャッシュせず、次回再取得する
+        if by_email or by_uid:
+            _global_user_index = (time.monotonic(), by_email, by_uid)
+        return by_email, by_uid
+
+
+_REPORT_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_report_date(date_str: str) -> Optional[datetime.date]:
+    """
+    レポート対象日（YYYY-MM-DD形式）をパースします。
+
+    Returns:
+        日付。形式が不正な場合は None（呼び出し側で今日の日付に置き換える。
+        日をまたいでも古い「今日」が残らないよう、フォールバック値はキャッシュしない）
+    """
+    if not _REPORT_DATE_RE.fullmatch(date_str):
+        return None
+    try:
+        return datetime.date.fromisoformat(date_str)
+    except ValueError:
+        # 2026-02-30 のように形式は正しいが存在しない日付
+        return None
+
+
+def _is_non_business_day(dt: datetime.date) -> bool:
+    """
+    土日・祝日かどうかを判定します。
+
+    Note:
+        祝日の判定は jpholiday がインストールされている場合のみ行います（未インストール時は土日のみ）。
+    """
+    if dt.weekday() >= 5:
+        return True
+    return bool(jpholiday and jpholiday.is_holiday(dt))
+
+
+def _format_report_entry(display_name: str, note: Optional[str]) -> str:
+    """日次レポートの1行分（表示名と、備考がある場合はカッコ内の備考）を整形します。"""
+    return f"{display_name}（{note}）" if note else display_name
+
+
+def _mrkdwn_section(text: str) -> Dict[str, Any]:
+    """mrkdwn テキスト1つだけの section ブロックを生成します。"""
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+def _record_get(record: Any, key: str) -> Any:
+    """勤怠記録（AttendanceRecordオブジェクトまたは辞書）から項目を取り出します。"""
+    return record.get(key) if isinstance(record, dict) else getattr(record, key, None)
+
 
 class NotificationService:
     """
@@ -54,26 +194,19 @@ class NotificationService:
         email を優先（別ワークスペースにいないユーザーは user_id で取れないため）。
         """
         try:
-            from resources.shared.db import get_global_user_list
-            users = get_global_user_list()
+            by_email, by_uid = _get_global_user_index()
             # 1. email を優先（このワークスペースにいないユーザーは users_info で取れない）
-            if email:
-                email_clean = (email or "").strip().lower()
-                if email_clean:
-                    for u in users:
-                        u_email = (u.get("email") or "").strip().lower()
-                        if u_email == email_clean:
-                            resolved = (u.get("display_name") or u.get("real_name") or "").strip()
-                            if resolved:
-                                logger.info(f"グローバルユーザーリストから名前解決(email): {email_clean} -> {resolved}")
-                                return resolved
+            email_clean = (email or "").strip().lower()
+            if email_clean:
+                resolved = by_email.get(email_clean)
+                if resolved:
+                    logger.info(f"グローバルユーザーリストから名前解決(email): {email_clean} -> {resolved}")
+                    return resolved
             # 2. user_id で照合（email がない場合のフォールバック）
-            for u in users:
-                if (u.get("user_id") or "") == clean_uid:
-                    resolved = (u.get("display_name") or u.get("real_name") or "").strip()
-                    if resolved:
-                        logger.info(f"グローバルユーザーリストから名前解決(user_id): {clean_uid} -> {resolved}")
-                        return resolved
+            resolved = by_uid.get(clean_uid)
+            if resolved:
+                logger.info(f"グローバルユーザーリストから名前解決(user_id): {clean_uid} -> {resolved}")
+                return resolved
         except Exception as e:
             logger.warning(f"グローバルユーザーリストからの名前解決失敗: {e}")
         return None
@@ -146,15 +279,15 @@ class NotificationService:
         """
         try:
             # ユーザーID・emailを取得（email は別ワークスペースのユーザー検索用）
-            user_id = record.user_id if hasattr(record, 'user_id') else record.get('user_id')
-            email = record.email if hasattr(record, 'email') else record.get('email')
+            user_id = _record_get(record, 'user_id')
+            email = _record_get(record, 'email')
             
             # 【重要】名前を必ず解決してから View層に渡す（user_id + email で検索）
             display_name = self.fetch_user_display_name(user_id, email=email)
             
             # 1. 削除通知の場合
             if is_delete:
-                date_val = record.date if hasattr(record, 'date') else record.get('date')
+                date_val = _record_get(record, 'date')
                 blocks = build_delete_notification(display_name, date_val)
                 
                 result = self.slack_wrapper.send_message(
@@ -177,7 +310,7 @@ class NotificationService:
                 show_buttons=True
             )
             
-            date_val = record.date if hasattr(record, 'date') else record.get('date')
+            date_val = _record_get(record, 'date')
             text = "勤怠記録を更新しました" if is_update else "勤怠を記録しました"
             
             result = self.slack_wrapper.send_message(
@@ -197,6 +330,72 @@ class NotificationService:
         except Exception as e:
             logger.error(f"通知送信失敗: {e}", exc_info=True)
 
+    def notify_attendance_changes(
+        self,
+        records: List[Any],
+        channel: str,
+        thread_ts: Optional[str] = None,
+        is_update: bool = False
+    ) -> None:
+        """
+        1つのメッセージから保存された複数の勤怠記録を、1通の通知にまとめて送信します。
+        
+        Args:
+            records: AttendanceRecordオブジェクトまたは辞書のリスト（表示順）
+            channel: 投稿先チャンネルID
+            thread_ts: スレッドのタイムスタンプ（スレッド返信する場合）
+            is_update: 更新通知かどうか
+            
+        Note:
+            複数日の連絡で日数分のメッセージを連投しないよう、各記録のカードを連結して送信します。
+            1件だけの場合は notify_attendance_change と同じ通知になります。
+            Slackの1メッセージあたりのブロック数上限を超える場合は複数通に分けます。
+        """
+        if not records:
+            return
+        if len(records) == 1:
+            self.notify_attendance_change(records[0], channel, thread_ts=thread_ts, is_update=is_update)
+            return
+
+        try:
+            display_names: Dict[str, str] = {}
+            messages: List[List[Dict[str, Any]]] = []
+            blocks: List[Dict[str, Any]] = []
+            for record in records:
+                user_id = _record_get(record, 'user_id')
+                email = _record_get(record, 'email')
+                # 同じユーザーの名前解決は1回だけ
+                if user_id not in display_names:
+                    display_names[user_id] = self.fetch_user_display_name(user_id, email=email)
+                card = build_attendance_card(
+                    record=record,
+                    display_name=display_names[user_id],
+                    is_update=is_update,
+                    show_buttons=True
+                )
+                if blocks and len(blocks) + len(card) > _MAX_BLOCKS_PER_MESSAGE:
+                    messages.append(blocks)
+                    blocks = []
+                blocks.extend(card)
+            messages.append(blocks)
+
+            label = "勤怠記録を更新しました" if is_update else "勤怠を記録しました"
+            text = f"{label}（{len(records)}件）"
+            for message_blocks in messages:
+                result = self.slack_wrapper.send_message(
+                    channel=channel,
+                    blocks=message_blocks,
+                    text=text,
+                    thread_ts=thread_ts
+                )
+                if result and result.get("ok"):
+                    logger.info(f"勤怠カードをまとめて送信しました: {len(records)}件, Update={is_update}")
+                else:
+                    logger.warning(f"勤怠カードの一括送信に失敗しました（not_in_channel 等）: {len(records)}件")
+
+        except Exception as e:
+            logger.error(f"通知送信失敗: {e}", exc_info=True)
+
     # ==========================================
     # 日次レポート送信
     # ==========================================
@@ -214,6 +413,10 @@ class NotificationService:
         Note:
             v2.3では、グループごとに個別のレポートメッセージを送信します。
             各メッセージの冒頭にはそのグループのadmin_ids全員分をメンションで付けます。
+            admin_ids と送信先が同じグループはブロック数上限の範囲で1通にまとめて送信します。
+            送信先はグループの report_channel_id、ワークスペースの report_channel_id、
+            Bot が参加しているチャンネルの順に決定します。
+            ワークスペース設定で skip_holidays が有効な場合、土日・祝日はレポートを送信しません。
         """
         if not self.attendance_service:
             logger.error("attendance_service が未設定のためレポート送信不可。")
@@ -225,153 +428,198 @@ class NotificationService:
 
         start_time = time.time()
         
-        # 1. 送信先チャンネルの決定
-        from resources.shared.db import get_workspace_config
-        workspace_config = get_workspace_config(workspace_id)
-        
-        report_channel_id = None
-        if workspace_config:
-            report_channel_id = workspace_config.get("report_channel_id")
-        
-        # report_channel_id が設定されていない場合は Bot が参加しているチャンネルに送信
-        if report_channel_id:
-            target_channels = [report_channel_id]
-        else:
-            target_channels = self.slack_wrapper.fetch_bot_joined_channels()
-        
-        if not target_channels:
-            logger.warning("送信先チャンネルが見つかりません。")
-            return
-        
-        # 2. 日付タイトルの準備
-        try:
-            dt = datetime.date.fromisoformat(date_str)
-        except:
+        # 1. 日付タイトルの準備
+        dt = _parse_report_date(date_str) if isinstance(date_str, str) else None
+        if dt is None:
             dt = datetime.date.today()
             logger.warning(f"日付のパースに失敗したため今日の日付を使用: {dt}")
-            
-        weekday_list = ["月", "火", "水", "木", "金", "土", "日"]
+
         month_day = dt.strftime('%m/%d')
-        weekday = weekday_list[dt.weekday()]
+        weekday = _WEEKDAYS[dt.weekday()]
+        date_label = f"{month_day}({weekday})"
+
+        # 土日・祝日をスキップする設定のワークスペースは、Firestore・Slack APIを呼ぶ前に終了する
+        # （設定の読み込みは対象日が土日・祝日の場合のみ）
+        if _is_non_business_day(dt):
+            workspace_config = get_workspace_config(workspace_id)
+            if workspace_config and workspace_config.get("skip_holidays"):
+                logger.info(f"土日・祝日のためレポートをスキップ: Workspace={workspace_id}, Date={dt}")
+                return
         
-        # 3. グループ情報を取得
-        from resources.services.group_service import GroupService
-        group_service = GroupService()
-        all_groups = group_service.get_all_groups(workspace_id)
+        # 2. グループ情報を取得（キャッシュ済みのことが多いため先に読み、グループがなければ記録を取得しない）
+        all_groups = _get_group_service().get_all_groups(workspace_id, use_cache=True)
         
         if not all_groups:
             logger.warning(f"グループが設定されていません: Workspace={workspace_id}")
             return
 
-        # 4. その日の全勤怠記録を一括取得（効率化）
-        from resources.shared.db import get_today_records
+        # 3. その日の全勤怠記録を一括取得（効率化）
         all_today_records = get_today_records(workspace_id, date_str)
         attendance_lookup = {r['user_id']: r for r in all_today_records}
 
-        # 5. 全グループに所属する全メンバーのIDを抽出（名前解決用）
-        all_member_ids = set()
-        for g in all_groups:
-            all_member_ids.update(g.get("member_ids", []))
-            all_member_ids.update(g.get("admin_ids", []))
+        # 4. 名前が必要なのは、いずれかのグループに所属し勤怠記録があるメンバーのみ
+        # （管理者は <@UID> 形式でメンションするため名前解決は不要）
+        reported_ids = {
+            uid
+            for g in all_groups
+            for uid in g.get("member_ids", [])
+            if uid in attendance_lookup
+        }
         
-        # 6. IDから名前への変換マップを作成
-        user_name_map = self.slack_wrapper.fetch_user_name_map(list(all_member_ids))
+        # 5. IDから名前への変換マップを作成
+        user_name_map = self.slack_wrapper.fetch_user_name_map(list(reported_ids)) if reported_ids else {}
 
-        # 7. グループごとにレポートを生成・送信
+        # 6. グループごとにレポートを生成
         logger.info("===== レポート送信処理開始（v2.3形式） =====")
+        # 勤怠記録を1回の走査で (ステータス, 表示行) に変換しておく
+        # （複数グループに所属するメンバーも整形はここで1回だけ）
+        report_entries: Dict[str, Tuple[str, str]] = {}
+        for user_id in reported_ids:
+            record = attendance_lookup[user_id]
+            report_entries[user_id] = (
+                record.get('status', 'other'),
+                _format_report_entry(user_name_map.get(user_id, user_id), record.get('note')),
+            )
+        get_entry = report_entries.get
+
+        reports = []
+        # 各レポートのグループ独自の送信先（None の場合はワークスペースの送信先）
+        report_channel_ids: List[Optional[str]] = []
+        # 送信先と管理者が同じグループは1通にまとめる（(送信先, 管理者集合) → reports 内の位置）
+        report_index_by_key: Dict[Tuple[Optional[str], frozenset], int] = {}
         for group in all_groups:
             group_name = group.get("name", "不明なグループ")
-            member_ids = group.get("member_ids", [])
+            group_channel_id = group.get("report_channel_id") or None
+            # 重複登録されたメンバーを1回だけ数える（登録順は維持）
+            member_ids = dict.fromkeys(group.get("member_ids", []))
             admin_ids = group.get("admin_ids", [])
+
+            # ステータスごとにグルーピング（辞書の参照はメンバー1人につき1回）
+            status_map: Dict[str, List[str]] = {}
+            for user_id in member_ids:
+                entry = get_entry(user_id)
+                if entry is not None:
+                    status_map.setdefault(entry[0], []).append(entry[1])
+
+            # 各ステータスをmrkdwn形式で表示（改行とタブで整形）
+            logger.info(f"グループ '{group_name}' のステータスマップ: {status_map}")
+
+            section_blocks: List[Dict[str, Any]] = []
+            append_block = section_blocks.append
+            for section_headers in _REPORT_SECTION_HEADERS:
+                added = False
+                for status_key, header in section_headers:
+                    rows = status_map.get(status_key)
+                    if rows:
+                        append_block(_mrkdwn_section(header + "\n\t".join(rows)))
+                        added = True
+
+                # 1件でも表示した単位の後にdividerを追加
+                if added:
+                    append_block(_DIVIDER_BLOCK)
+
+            # 表示する勤怠がないグループはレポートを作らない（レポート対象外のステータスのみの場合も空のレポートを送信しない）
+            if not section_blocks:
+                logger.info(f"グループ '{group_name}' は勤怠記録がないためスキップ")
+                continue
             
             # 管理者メンション（<@UID>形式でメンションが効くようにする）
             mention_text = " ".join([f"<@{uid}>" for uid in admin_ids]) if admin_ids else ""
             logger.info(f"グループ '{group_name}' のレポート生成: admin_ids={admin_ids}, mention_text={mention_text}")
             
-            # レポートブロックの構築
-            blocks = []
-            
+            # レポートブロックの構築（タイトル（グループ名を含む）以降。メンションは送信メッセージ単位で付ける）
+            blocks = [_mrkdwn_section(f"*{date_label}の勤怠（{group_name}）*"), _DIVIDER_BLOCK, *section_blocks]
+
+            # 同じ送信先・管理者のレポートが既にあり、ブロック数上限に収まる場合は同じメッセージに連結する
+            report_key = (group_channel_id, frozenset(admin_ids))
+            index = report_index_by_key.get(report_key)
+            if index is not None and len(reports[index][1]) + len(blocks) <= _MAX_BLOCKS_PER_MESSAGE:
+                merged_name, merged_blocks, _ = reports[index]
+                merged_blocks.extend(blocks)
+                merged_name = f"{merged_name}・{group_name}"
+                reports[index] = (merged_name, merged_blocks, f"{merged_name}の{date_label}の勤怠")
+                continue
+
             # 管理者メンション（mrkdwn形式でメンションが効くようにする）
             if mention_text:
-                blocks.append({
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": mention_text}
-                })
-            
-            # タイトル（グループ名を含む）
-            blocks.append({
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": f"*{month_day}({weekday})の勤怠（{group_name}）*"}
-            })
-            blocks.append({"type": "divider"})
-            
-            # ステータスごとにグルーピング
-            status_map = {}
-            for user_id in member_ids:
-                if user_id in attendance_lookup:
-                    record = attendance_lookup[user_id]
-                    st = record.get('status', 'other')
-                    display_name = user_name_map.get(user_id, user_id)
-                    note = record.get('note', '')
-                    
-                    if st not in status_map:
-                        status_map[st] = []
-                    
-                    # 備考がある場合はカッコ内に追加
-                    if note:
-                        status_map[st].append(f"{display_name}（{note}）")
-                    else:
-                        status_map[st].append(display_name)
-            
-            # 各ステータスをmrkdwn形式で表示（改行とタブで整形）
-            from resources.constants import STATUS_TRANSLATION
-            logger.info(f"グループ '{group_name}' のステータスマップ: {status_map}")
-            
-            # 該当者がいる区分のみ表示（区分の定義順）
-            status_order = [
-                ("vacation", "全休"),
-                ("vacation_am", "AM休"),
-                ("vacation_pm", "PM休"),
-                ("vacation_hourly", "時間休"),
-                ("late_delay", "電車遅延"),
-                ("late", "遅刻"),
-                ("remote", "在宅"),
-                ("out", "外出"),
-                ("shift", "シフト勤務"),
-                ("early_leave", "早退"),
-                ("other", "その他")
-            ]
-            
-            # 区分ごとの区切り位置（この区分の後にdividerを入れる）
-            divider_after = {"vacation_hourly", "late", "remote", "out", "shift", "early_leave", "other"}
-            
-            for status_key, status_label in status_order:
-                if status_key in status_map:
-                    users_text = " \n\t".join(status_map[status_key])
-                    blocks.append({
-                        "type": "section",
-                        "text": {"type": "mrkdwn", "text": f"*{status_label}：* \n\t{users_text}"}
-                    })
-                    
-                    # 指定された区分の後にdividerを追加
-                    if status_key in divider_after:
-                        blocks.append({"type": "divider"})
-
-            # 8. メッセージ送信 
-            try:
-                for channel_id in target_channels:
-                    self.slack_wrapper.send_message(
-                        channel=channel_id,
-                        blocks=blocks,
-                        text=f"{group_name}の{month_day}({weekday})の勤怠"
-                    )
-                    logger.info(f"レポート送信成功: Group={group_name}, Channel={channel_id}")
-            except Exception as e:
-                logger.error(f"グループレポート送信エラー: Group={group_name}, {e}")
+                blocks.insert(0, _mrkdwn_section(mention_text))
+            report_index_by_key[report_key] = len(reports)
+            reports.append((group_name, blocks, f"{group_name}の{date_label}の勤怠"))
+            report_channel_ids.append(group_channel_id)
+
+        if not reports:
+            logger.info(f"勤怠記録のあるグループがないためレポートを送信しません: Workspace={workspace_id}")
+            return
+
+        # 7. 送信先ごとにレポートを振り分け（ワークスペースの送信先は必要な場合のみ取得）
+        default_channels: List[str] = []
+        if None in report_channel_ids:
+            default_channels = self._fetch_default_report_channels(workspace_id)
+            if not default_channels:
+                logger.warning("送信先チャンネルが見つかりません。")
+
+        reports_by_channel: Dict[str, List[Tuple[str, List[Dict[str, Any]], str]]] = {}
+        for report, group_channel_id in zip(reports, report_channel_ids):
+            for channel_id in ([group_channel_id] if group_channel_id else default_channels):
+                reports_by_channel.setdefault(channel_id, []).append(report)
+
+        if not reports_by_channel:
+            return
+
+        # 8. メッセージ送信（チャンネル間は並行、同一チャンネル内はグループ順を保つため順に送信）
+        if len(reports_by_channel) == 1:
+            channel_id, channel_reports = next(iter(reports_by_channel.items()))
+            self._send_reports_to_channel(channel_id, channel_reports)
+        else:
+            max_workers = min(len(reports_by_channel), REPORT_SEND_MAX_WORKERS)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._send_reports_to_channel, channel_id, channel_reports): channel_id
+                    for channel_id, channel_reports in reports_by_channel.items()
+                }
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"チャンネルへのレポート送信エラー: Channel={futures[future]}, {e}")
         
         total_end = time.time()
         logger.info(f"レポート送信処理完了 所要時間: {total_end - start_time:.4f}秒")
 
+    def _fetch_default_report_channels(self, workspace_id: str) -> List[str]:
+        """
+        ワークスペースのレポート送信先チャンネルを取得します。
+
+        Args:
+            workspace_id: Slackワークスペースの一意ID
+
+        Returns:
+            ワークスペースの report_channel_id。未設定の場合は Bot が参加しているチャンネルの一覧
+        """
+        workspace_config = get_workspace_config(workspace_id)
+        report_channel_id = workspace_config.get("report_channel_id") if workspace_config else None
+        if report_channel_id:
+            return [report_channel_id]
+        return self.slack_wrapper.fetch_bot_joined_channels()
+
+    def _send_reports_to_channel(self, channel_id: str, reports: List[Tuple[str, List[Dict[str, Any]], str]]) -> None:
+        """
+        1つのチャンネルにグループごとのレポートを順に送信します。
+
+        Args:
+            channel_id: 送信先チャンネルID
+            reports: (グループ名, blocks, フォールバックテキスト) のリスト（送信順）
+        """
+        for group_name, blocks, text in reports:
+            try:
+                result = self.slack_wrapper.send_message(channel=channel_id, blocks=blocks, text=text)
+                if result:
+                    logger.info(f"レポート送信成功: Group={group_name}, Channel={channel_id}")
+                else:
+                    logger.warning(f"レポート送信失敗: Group={group_name}, Channel={channel_id}")
+            except Exception as e:
+                logger.error(f"グループレポート送信エラー: Group={group_name}, Channel={channel_id}, {e}")
+
     # ==========================================
     # 後方互換性のため（旧メソッド名）
     # ==========================================
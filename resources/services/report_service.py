@@ -13,7 +13,7 @@ from datetime import date
 from typing import Optional
 
 # クラウド対応済みの db 関数をインポート
-from resources.shared.db import init_db, get_attendance_records_by_sections
+from resources.shared.db import init_db, get_attendance_records_grouped_by_section
 from resources.views.modal_views import build_daily_report_blocks
 from resources.constants import SECTION_TRANSLATION
 
@@ -49,15 +49,11 @@ def send_daily_report(target_date: Optional[str] = None, workspace_id: str = Non
         from resources.clients.slack_client import get_slack_client
         client = get_slack_client(workspace_id)
         
-        # 各セクション（課）ごとにデータを集計
+        # 全セクション（課）のデータを1回のクエリで取得し、セクションごとに集計
+        records_by_section = get_attendance_records_grouped_by_section(workspace_id, today, all_section_ids)
         for sid in all_section_ids:
             section_name = SECTION_TRANSLATION.get(sid, sid)
-            # Firestoreから該当セクションのメンバーの打刻を取得
-            rows = get_attendance_records_by_sections(workspace_id, today, [sid])
-            
-            # Firestoreのデータはすでに辞書形式なので dict(r) は不要な場合が多いですが、
-            # 安全のためにリストとして格納
-            report_data[section_name] = rows if rows else []
+            report_data[section_name] = records_by_section.get(sid, [])
         
         logger.info(f"集計完了: {len(report_data)} セクション")
 
@@ -10,6 +10,7 @@ from google.cloud import firestore
 
 from resources.shared.errors import ValidationError
 from resources.constants import get_collection_name, APP_ENV
+from resources.shared.db import get_firestore_client
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ class WorkspaceService:
         """ワークスペースサービスの初期化"""
         # 空文字列チェック
         db_name = APP_ENV.strip() if APP_ENV and APP_ENV.strip() else "develop"
-        self.db = firestore.Client(database=db_name)
+        self.db = get_firestore_client(db_name)
         logger.info(f"WorkspaceService initialized with database: {db_name}")
 
     def get_admin_ids(self, workspace_id: str) -> List[str]:
@@ -9,6 +9,8 @@ import logging
 
 import google.auth.transport.requests
 import google.oauth2.id_token
+import requests
+from requests.adapters import HTTPAdapter
 
 from resources.constants import APP_ENV
 from resources.shared.errors import AuthorizationError
@@ -22,6 +24,13 @@ _AUDIENCE_MAP = {
 }
 
 
+# Google 公開鍵（証明書）取得用の HTTP セッション。
+# 検証のたびに新しいセッション（TCP/TLS 接続）を作らず、keep-alive 接続を使い回す
+_http_session = requests.Session()
+_http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_transport = google.auth.transport.requests.Request(session=_http_session)
+
+
 def verify_oidc_token(request) -> None:
     """
     リクエストの Authorization ヘッダーから OIDC トークンを取得し、
@@ -43,8 +52,7 @@ def verify_oidc_token(request) -> None:
     audience = _AUDIENCE_MAP.get(APP_ENV, _AUDIENCE_MAP["develop"])
 
     try:
-        transport = google.auth.transport.requests.Request()
-        google.oauth2.id_token.verify_oauth2_token(token, transport, audience=audience)
+        google.oauth2.id_token.verify_oauth2_token(token, _transport, audience=audience)
         logger.info(f"[OIDC] Token verified successfully (audience={audience})")
     except Exception as e:
         logger.warning(f"[OIDC] Token verification failed: {e}")
@@ -5,10 +5,12 @@ Firestore データベース操作モジュール
 全ての関数はworkspace_idを引数に取り、マルチテナント環境に対応しています。
 """
 
-import os
 import datetime
 import logging
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from operator import itemgetter
+from typing import Optional, List, Dict, Any, Tuple
 from google.cloud import firestore
 
 from resources.constants import get_collection_name, APP_ENV, DB_ENV
@@ -51,6 +53,32 @@ except Exception as e:
     logger.error(f"Failed to initialize Firestore client: {e}")
     raise
 
+# データベース名ごとのFirestoreクライアント（サービス・リスナー間で共有する）
+_firestore_clients: Dict[str, firestore.Client] = {DB_ENV: db}
+_firestore_clients_lock = threading.Lock()
+
+
+def get_firestore_client(database: str) -> firestore.Client:
+    """
+    指定したデータベースのFirestoreクライアントを返します。
+    
+    Args:
+        database: Firestoreデータベース名
+        
+    Returns:
+        そのデータベース用の共有クライアント（初回呼び出し時に生成）
+        
+    Note:
+        Firestoreクライアントはスレッドセーフで内部に接続を保持するため、
+        インスタンスごとに生成せずプロセス内で使い回します。
+    """
+    with _firestore_clients_lock:
+        client = _firestore_clients.get(database)
+        if client is None:
+            client = firestore.Client(database=database)
+            _firestore_clients[database] = client
+        return client
+
 
 def init_db() -> None:
     """
@@ -195,7 +223,7 @@ def get_user_history_from_db(
         filtered = [r for r in results if r.get('date', '').startswith(month_filter)]
         
         # 日付の降順でソート（新しい順）
-        return sorted(filtered, key=lambda x: x['date'], reverse=True)
+        return sorted(filtered, key=itemgetter('date'), reverse=True)
     except Exception as e:
         logger.error(f"Error fetching user history: {e}", exc_info=True)
         return []
@@ -486,11 +514,75 @@ def get_attendance_records_by_sections(
         logger.error(f"Error fetching records by sections: {e}", exc_info=True)
         return []
 
+def get_attendance_records_grouped_by_section(
+    workspace_id: str,
+    target_date: str,
+    section_ids: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    複数セクション（課）の勤怠記録を一括取得し、セクションごとに振り分けます。
+    
+    Args:
+        workspace_id: Slackワークスペースの一意ID
+        target_date: 対象日（YYYY-MM-DD形式）
+        section_ids: セクションIDの配列（例: ["sec_1", "sec_2"]）
+        
+    Returns:
+        {セクションID: 該当メンバーの勤怠記録配列}（全セクションのキーを含む）
+        
+    Note:
+        セクションごとに get_attendance_records_by_sections を呼ぶと、メンバー設定の取得と
+        IN句クエリがセクション数だけ発生するため、メンバー設定1回・日付クエリ1回にまとめます。
+        IN句を使わないため、30名を超えるセクションも切り捨てられません。
+    """
+    grouped: Dict[str, List[Dict[str, Any]]] = {sid: [] for sid in section_ids}
+    try:
+        section_map, _ = get_channel_members_with_section(workspace_id)
+        # ユーザーID → 所属セクション（複数所属も考慮）
+        sections_by_user: Dict[str, List[str]] = {}
+        for sid in section_ids:
+            for uid in section_map.get(sid, []):
+                sections_by_user.setdefault(uid, []).append(sid)
+        if not sections_by_user:
+            logger.info(f"No members found in sections {section_ids}")
+            return grouped
+
+        for record in get_today_records(workspace_id, target_date):
+            for sid in sections_by_user.get(record.get("user_id"), ()):
+                grouped[sid].append(record)
+
+        logger.info(f"Retrieved records for {len(section_ids)} sections on {target_date} in one query")
+        return grouped
+    except Exception as e:
+        logger.error(f"Error fetching records grouped by sections: {e}", exc_info=True)
+        return grouped
+
 
 # ==========================================
 # ワークスペース管理（マルチテナント対応）
 # ==========================================
 
+# ワークスペース設定のキャッシュ（team_id ごと）。get_slack_client などで頻繁に参照されるため
+# このプロセスでの更新時は invalidate_workspace_config で即時破棄し、他インスタンスの更新は TTL 経過後に反映される
+WORKSPACE_CONFIG_CACHE_TTL_SEC = 300
+_workspace_config_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_workspace_config_cache_lock = threading.Lock()
+
+
+def invalidate_workspace_config(team_id: str) -> None:
+    """
+    ワークスペース設定のキャッシュを破棄します。
+    
+    Args:
+        team_id: Slackワークスペースの一意ID
+        
+    Note:
+        workspaces コレクションを更新した箇所から呼び出してください。
+    """
+    with _workspace_config_cache_lock:
+        _workspace_config_cache.pop(team_id, None)
+
+
 def get_workspace_config(team_id: str) -> Optional[Dict[str, Any]]:
     """
     ワークスペース設定（bot_token、report_channel_idなど）を取得します。
@@ -505,6 +597,7 @@ def get_workspace_config(team_id: str) -> Optional[Dict[str, Any]]:
             "team_name": "Example Workspace",
             "bot_token": "xoxb-...",
             "report_channel_id": "C01234567",
+            "skip_holidays": True,  # 任意。土日・祝日の日次レポートを送信しない
             "installed_at": "2026-01-24T10:00:00"
         }
         存在しない場合やエラー時はNone
@@ -512,7 +605,14 @@ def get_workspace_config(team_id: str) -> Optional[Dict[str, Any]]:
     Note:
         データベース接続エラーやFirestoreエラーが発生した場合は、
         安全にNoneを返します。
+        取得結果は WORKSPACE_CONFIG_CACHE_TTL_SEC 秒キャッシュされます（未登録・エラー時はキャッシュしない）。
     """
+    with _workspace_config_cache_lock:
+        cached = _workspace_config_cache.get(team_id)
+    if cached and time.monotonic() - cached[0] < WORKSPACE_CONFIG_CACHE_TTL_SEC:
+        # 呼び出し側で変更されてもキャッシュが壊れないようコピーを返す
+        return dict(cached[1])
+
     try:
         doc = db.collection(get_collection_name("workspaces")).document(team_id).get()
         
@@ -526,7 +626,9 @@ def get_workspace_config(team_id: str) -> Optional[Dict[str, Any]]:
             return None
         
         logger.info(f"ワークスペース設定取得成功: {team_id}")
-        return data
+        with _workspace_config_cache_lock:
+            _workspace_config_cache[team_id] = (time.monotonic(), data)
+        return dict(data)
     except Exception as e:
         logger.error(f"ワークスペース設定取得エラー: {e}", exc_info=True)
         return None
@@ -561,6 +663,7 @@ def save_workspace_config(
             "installed_at": firestore.SERVER_TIMESTAMP,
             "updated_at": firestore.SERVER_TIMESTAMP
         }, merge=True)
+        invalidate_workspace_config(team_id)
         
         logger.info(f"ワークスペース設定保存成功: {team_id} ({team_name})")
     except Exception as e:
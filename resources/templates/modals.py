@@ -6,6 +6,7 @@
 """
 import datetime
 import json
+from operator import itemgetter
 from typing import Dict, Any, Optional, List
 from resources.constants import STATUS_TRANSLATION
 
@@ -170,7 +171,7 @@ def build_history_modal(
         })
     else:
         # 新しい順にソート
-        sorted_records = sorted(history_records, key=lambda x: x['date'], reverse=True)
+        sorted_records = sorted(history_records, key=itemgetter('date'), reverse=True)
         for rec in sorted_records:
             status_jp = STATUS_TRANSLATION.get(rec['status'], rec['status'])
             blocks.append({